@@ -0,0 +1,6 @@
+"""
+Benchmark helpers for Fiberhome OLT collection.
+
+Not deployed: the stand-in OLT and the wire benchmark run from a checkout of
+the repository (python -m bench.wire_bench).
+"""
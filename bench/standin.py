@@ -0,0 +1,286 @@
+"""
+Local stand-in OLT for transport benchmarks.
+
+Serves the same Fiberhome CLI session (login, EN elevation, echo, prompts
+and a synthetic authorization table) over plain Telnet and over SSH, so
+both transports of FiberhomeClient can be measured against identical
+output. A WireProxy in front of a server counts the bytes on the wire and
+can emulate a slow, high-latency backhaul.
+
+The SSH side needs asyncssh (optional dependency).
+"""
+
+import asyncio
+from collections.abc import Callable
+from time import monotonic
+
+STANDIN_PHY_PREFIX = "FHTT"
+
+_TELNET_IAC = 0xFF
+
+
+def synthetic_auth_output(slots: int = 8, pons: int = 16, onus: int = 64) -> str:
+    """Build a `show authorization` table with slots * pons * onus ONUs."""
+    lines: list[str] = []
+    for slot in range(1, slots + 1):
+        for pon in range(1, pons + 1):
+            lines.append(
+                f"----- ONU Auth Table, SLOT = {slot}, PON = {pon}, ITEM = {onus} -----"
+            )
+            lines.append("Slot Pon Onu OnuType  ST Lic OST PhyId")
+            for onu in range(1, onus + 1):
+                status = "dn" if onu % 10 == 0 else "up"
+                phy_id = f"{STANDIN_PHY_PREFIX}{slot:02x}{pon:02x}{onu:04x}"
+                lines.append(f"{slot:<4} {pon:<3} {onu:<3} HG260    A  1   {status}  {phy_id}")
+            lines.append("")
+    return "\n".join(lines)
+
+
+class StandInSession:
+    """CLI state machine of one stand-in session; feed bytes, get bytes back."""
+
+    def __init__(
+        self,
+        password: str,
+        responder: Callable[[str], str],
+        authenticated: bool = False,
+        banner: str = "",
+    ) -> None:
+        self.password = password
+        self.responder = responder
+        self.banner = banner
+        self._state = "cli" if authenticated else "login"
+        self._prompt = "User>"
+        self._line = b""
+
+    def greeting(self) -> bytes:
+        banner = self.banner.replace("\n", "\r\n").encode()
+        if self._state == "login":
+            return banner + b"Login:"
+        return banner + self._prompt.encode()
+
+    def feed(self, data: bytes) -> bytes:
+        output = bytearray()
+        for byte in data:
+            if byte == ord("\r"):
+                continue
+            if byte != ord("\n"):
+                self._line += bytes([byte])
+                if self._state not in ("password", "enable"):
+                    output.append(byte)
+                continue
+            line, self._line = self._line.decode(errors="replace").strip(), b""
+            output += self._answer(line)
+        return bytes(output)
+
+    def _answer(self, line: str) -> bytes:
+        if self._state == "login":
+            self._state = "password"
+            return b"\r\nPassword:"
+        if self._state == "password":
+            self._state = "cli"
+            return b"\r\n" + self._prompt.encode()
+        if self._state == "enable":
+            self._state = "cli"
+            if line == self.password:
+                self._prompt = "Admin#"
+            return b"\r\n" + self._prompt.encode()
+        if line == "EN":
+            self._state = "enable"
+            return b"\r\nPassword:"
+
+        body = self.responder(line) if line else ""
+        if body and not body.endswith("\n"):
+            body += "\n"
+        return b"\r\n" + body.replace("\n", "\r\n").encode() + self._prompt.encode()
+
+
+def auth_responder(auth_output: str) -> Callable[[str], str]:
+    """Answer `show authorization` with auth_output and everything else empty."""
+
+    def respond(line: str) -> str:
+        return auth_output if line.startswith("show authorization") else ""
+
+    return respond
+
+
+async def start_telnet_standin(
+    responder: Callable[[str], str],
+    password: str,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    banner: str = "",
+) -> asyncio.AbstractServer:
+    """Serve the stand-in CLI over plain Telnet (no option negotiation)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = StandInSession(password, responder, banner=banner)
+        writer.write(session.greeting())
+        try:
+            while data := await reader.read(4096):
+                # Scrapli never negotiates first; drop any stray IAC sequences.
+                if _TELNET_IAC in data:
+                    data = data[: data.index(_TELNET_IAC)]
+                writer.write(session.feed(data))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def start_ssh_standin(
+    responder: Callable[[str], str],
+    username: str,
+    password: str,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> object:
+    """Serve the stand-in CLI over SSH with password auth and zlib available."""
+    import asyncssh
+
+    class _Server(asyncssh.SSHServer):
+        def begin_auth(self, _username: str) -> bool:
+            return True
+
+        def password_auth_supported(self) -> bool:
+            return True
+
+        def validate_password(self, login: str, secret: str) -> bool:
+            return login == username and secret == password
+
+    async def handle(process: asyncssh.SSHServerProcess) -> None:
+        session = StandInSession(password, responder, authenticated=True)
+        process.stdout.write(session.greeting())
+        try:
+            while data := await process.stdin.read(4096):
+                process.stdout.write(session.feed(data))
+                await process.stdout.drain()
+        except (asyncssh.Error, ConnectionError):
+            pass
+        finally:
+            process.exit(0)
+
+    return await asyncssh.create_server(
+        _Server,
+        host,
+        port,
+        server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+        process_factory=handle,
+        encoding=None,
+        line_editor=False,
+        compression_algs=["zlib@openssh.com", "zlib", "none"],
+    )
+
+
+def server_port(server: object) -> int:
+    """Return the bound port of an asyncio or asyncssh server."""
+    sockets = server.sockets if hasattr(server, "sockets") else server.get_addresses()
+    first = sockets[0]
+    return first.getsockname()[1] if hasattr(first, "getsockname") else first[1]
+
+
+class WireProxy:
+    """TCP proxy that counts bytes and optionally emulates a slow link."""
+
+    def __init__(
+        self,
+        target_port: int,
+        target_host: str = "127.0.0.1",
+        latency_ms: float = 0,
+        bandwidth_kbps: float = 0,
+    ) -> None:
+        self.target_host = target_host
+        self.target_port = target_port
+        self.latency = latency_ms / 1000
+        self.rate = bandwidth_kbps * 1000 / 8
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.Task] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # Let in-flight connections drain once both ends have closed.
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    def reset(self) -> None:
+        self.bytes_up = 0
+        self.bytes_down = 0
+
+    async def _handle(
+        self,
+        client_reader: asyncio.StreamReader,
+        client_writer: asyncio.StreamWriter,
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        task.add_done_callback(self._connections.discard)
+        try:
+            target_reader, target_writer = await asyncio.open_connection(
+                self.target_host, self.target_port
+            )
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            self._pump(client_reader, target_writer, upstream=True),
+            self._pump(target_reader, client_writer, upstream=False),
+        )
+
+    async def _pump(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        upstream: bool,
+    ) -> None:
+        # Chunks are serialized at `rate` and delivered `latency` later, so
+        # the link behaves like a pipe rather than a per-chunk stall.
+        queue: asyncio.Queue[tuple[float, bytes]] = asyncio.Queue()
+        deliver = asyncio.create_task(self._deliver(queue, writer))
+        busy_until = 0.0
+        try:
+            while data := await reader.read(65536):
+                if upstream:
+                    self.bytes_up += len(data)
+                else:
+                    self.bytes_down += len(data)
+                sent_at = max(monotonic(), busy_until)
+                if self.rate:
+                    sent_at += len(data) / self.rate
+                busy_until = sent_at
+                queue.put_nowait((sent_at + self.latency, data))
+        except ConnectionError:
+            pass
+        finally:
+            queue.put_nowait((0.0, b""))
+            await deliver
+
+    @staticmethod
+    async def _deliver(
+        queue: "asyncio.Queue[tuple[float, bytes]]",
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            while True:
+                due, data = await queue.get()
+                if not data:
+                    break
+                delay = due - monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,106 @@
+"""
+Wire benchmark: Telnet vs SSH vs compressed SSH against a local stand-in OLT.
+
+Runs the status pipeline over each transport through a WireProxy that
+counts the bytes on the wire and can emulate a slow, high-latency backhaul
+link. SSH needs asyncssh. Run from a checkout of the repository:
+
+  python3 -m bench.wire_bench [--slots 8] [--pons 16] [--onus 64]
+                              [--iterations N] [--latency-ms MS] [--bandwidth-kbps KBPS]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from time import perf_counter
+from typing import Any
+
+from bench.standin import (
+    WireProxy,
+    auth_responder,
+    server_port,
+    start_ssh_standin,
+    start_telnet_standin,
+    synthetic_auth_output,
+)
+from fiberhome_olt_status import collect_olt_status
+
+WIRE_VARIANTS = ("telnet", "ssh", "ssh+zlib")
+STANDIN_USER = "bench"
+STANDIN_PASSWORD = "bench"
+
+
+async def bench_wire(args: argparse.Namespace) -> dict[str, Any]:
+    """Compare bytes on the wire and wall time of Telnet, SSH and SSH+zlib."""
+    responder = auth_responder(synthetic_auth_output(args.slots, args.pons, args.onus))
+    telnet_server = await start_telnet_standin(responder, STANDIN_PASSWORD)
+    ssh_server = await start_ssh_standin(responder, STANDIN_USER, STANDIN_PASSWORD)
+    targets = {"telnet": server_port(telnet_server), "ssh": server_port(ssh_server)}
+
+    variants: dict[str, dict[str, Any]] = {}
+    outputs: list[str] = []
+    try:
+        for variant in WIRE_VARIANTS:
+            proxy = WireProxy(
+                targets[variant.partition("+")[0]],
+                latency_ms=args.latency_ms,
+                bandwidth_kbps=args.bandwidth_kbps,
+            )
+            proxy_port = await proxy.start()
+            spec = str(proxy_port) if variant == "telnet" else f"{variant}:{proxy_port}"
+            durations: list[float] = []
+            result: dict[str, Any] = {}
+            for _ in range(args.iterations):
+                started_at = perf_counter()
+                result = await collect_olt_status(
+                    "127.0.0.1", STANDIN_USER, STANDIN_PASSWORD, spec
+                )
+                durations.append((perf_counter() - started_at) * 1000)
+            await proxy.stop()
+
+            outputs.append(json.dumps(result["data"]["pon_ports"], sort_keys=True))
+            variants[variant] = {
+                "success": result["data"]["metadata"]["success"],
+                "bytes_down": proxy.bytes_down // args.iterations,
+                "bytes_up": proxy.bytes_up // args.iterations,
+                "min_ms": round(min(durations), 2),
+                "median_ms": round(statistics.median(durations), 2),
+                "max_ms": round(max(durations), 2),
+            }
+    finally:
+        telnet_server.close()
+        ssh_server.close()
+
+    return {
+        "onus": args.slots * args.pons * args.onus,
+        "iterations": args.iterations,
+        "latency_ms": args.latency_ms,
+        "bandwidth_kbps": args.bandwidth_kbps,
+        "same_output": len(set(outputs)) == 1,
+        "variants": variants,
+    }
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare OLT transports on the wire")
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--pons", type=int, default=16)
+    parser.add_argument("--onus", type=int, default=64)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--bandwidth-kbps", type=float, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for the wire benchmark."""
+    report = asyncio.run(bench_wire(parse_args(sys.argv[1:] if argv is None else argv)))
+    print(json.dumps(report, indent=2))
+    success = all(variant["success"] for variant in report["variants"].values())
+    return 0 if success and report["same_output"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
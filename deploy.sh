@@ -119,21 +119,37 @@ deploy_scripts() {
     cp "${SOURCE_DIR}/fiberhome_olt_status.py" "${SCRIPTS_DIR}/"
     cp "${SOURCE_DIR}/fiberhome_olt_signals.py" "${SCRIPTS_DIR}/"
     cp "${SOURCE_DIR}/fiberhome_olt_lld.py" "${SCRIPTS_DIR}/"
+    cp "${SOURCE_DIR}/fiberhome_olt_fleet.py" "${SCRIPTS_DIR}/"
+    cp "${SOURCE_DIR}/fiberhome_olt_replay.py" "${SCRIPTS_DIR}/"
+    cp "${SOURCE_DIR}/fiberhome_onu_lookup.py" "${SCRIPTS_DIR}/"
+    cp "${SOURCE_DIR}/fiberhome_olt_exporter.py" "${SCRIPTS_DIR}/"
 
     # Set permissions
     chmod +x "${SCRIPTS_DIR}/fiberhome_olt_status.py"
     chmod +x "${SCRIPTS_DIR}/fiberhome_olt_signals.py"
     chmod +x "${SCRIPTS_DIR}/fiberhome_olt_lld.py"
+    chmod +x "${SCRIPTS_DIR}/fiberhome_olt_fleet.py"
+    chmod +x "${SCRIPTS_DIR}/fiberhome_olt_replay.py"
+    chmod +x "${SCRIPTS_DIR}/fiberhome_onu_lookup.py"
+    chmod +x "${SCRIPTS_DIR}/fiberhome_olt_exporter.py"
 
     chown -R zabbix:zabbix "${FIBERHOME_DIR}"
     chown zabbix:zabbix "${SCRIPTS_DIR}/fiberhome_olt_status.py"
     chown zabbix:zabbix "${SCRIPTS_DIR}/fiberhome_olt_signals.py"
     chown zabbix:zabbix "${SCRIPTS_DIR}/fiberhome_olt_lld.py"
+    chown zabbix:zabbix "${SCRIPTS_DIR}/fiberhome_olt_fleet.py"
+    chown zabbix:zabbix "${SCRIPTS_DIR}/fiberhome_olt_replay.py"
+    chown zabbix:zabbix "${SCRIPTS_DIR}/fiberhome_onu_lookup.py"
+    chown zabbix:zabbix "${SCRIPTS_DIR}/fiberhome_olt_exporter.py"
 
     log_info "Scripts deployed successfully"
     log_info "  - ${SCRIPTS_DIR}/fiberhome_olt_status.py"
     log_info "  - ${SCRIPTS_DIR}/fiberhome_olt_signals.py"
     log_info "  - ${SCRIPTS_DIR}/fiberhome_olt_lld.py"
+    log_info "  - ${SCRIPTS_DIR}/fiberhome_olt_fleet.py"
+    log_info "  - ${SCRIPTS_DIR}/fiberhome_olt_replay.py"
+    log_info "  - ${SCRIPTS_DIR}/fiberhome_onu_lookup.py"
+    log_info "  - ${SCRIPTS_DIR}/fiberhome_olt_exporter.py"
     log_info "  - ${FIBERHOME_DIR}/ (module files)"
 }
 
@@ -144,10 +160,21 @@ test_scripts() {
     "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/parsers.py"
     "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/scrapli_client.py"
     "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/bootstrap.py"
+    "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/transcript.py"
+    "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/state.py"
+    "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/zabbix_sender.py"
+    "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/profiling.py"
+    "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/dialects.py"
+    "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/onu_index.py"
+    "${VENV_PYTHON}" -m py_compile "${FIBERHOME_DIR}/metrics.py"
     # Wrapper scripts
     "${VENV_PYTHON}" -m py_compile "${SCRIPTS_DIR}/fiberhome_olt_status.py"
     "${VENV_PYTHON}" -m py_compile "${SCRIPTS_DIR}/fiberhome_olt_signals.py"
     "${VENV_PYTHON}" -m py_compile "${SCRIPTS_DIR}/fiberhome_olt_lld.py"
+    "${VENV_PYTHON}" -m py_compile "${SCRIPTS_DIR}/fiberhome_olt_fleet.py"
+    "${VENV_PYTHON}" -m py_compile "${SCRIPTS_DIR}/fiberhome_olt_replay.py"
+    "${VENV_PYTHON}" -m py_compile "${SCRIPTS_DIR}/fiberhome_onu_lookup.py"
+    "${VENV_PYTHON}" -m py_compile "${SCRIPTS_DIR}/fiberhome_olt_exporter.py"
     log_info "Syntax check passed"
 }
 
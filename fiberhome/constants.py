@@ -14,6 +14,28 @@ TELNET_TIMEOUT = 15
 CMD_WAIT_SHORT = 0.5
 CMD_WAIT_LONG = 30  # Wait for complete ONU listing (800+ ONUs)
 CMD_WAIT_SIGNAL = 5  # Wait per-PON signal collection
+CMD_TIMEOUT_SIGNAL = 15  # Hard timeout for one optic_module_para command
+SIGNALS_DEADLINE = 25  # Overall signals sweep budget (below the external-check timeout)
+SIGNALS_EXIT_RESERVE = 2  # Budget kept for logout and JSON output
+SIGNALS_RELOGIN_MIN = 3  # Least login time worth reopening a session mid-sweep
+
+# Worst-ONU report sizes
+WORST_ONU_COUNT = 50  # Global worst-N per OLT (also kept per PON as candidates)
+WORST_ONU_PER_PON = 5  # Worst-N reported for each PON
+
+# Drill-down for ONUs that changed state
+DRILLDOWN_BUDGET = 10  # Max per-ONU detail commands per status run
+DRILLDOWN_MIN_SECONDS = 5  # Time left required before starting the drill-down
+FLAP_WINDOW = 3600  # Seconds of state-change history kept per ONU
+FLAP_TRANSITIONS = 2  # Changes within FLAP_WINDOW that count as flapping
+
+# Slot-partitioned authorization
+AUTH_SLOT_TIMEOUT = 20  # Hard timeout for one per-slot authorization query
+AUTH_SLOT_RETRIES = 1  # Extra attempts for a slot whose query failed
+STATUS_DEADLINE = 25  # Overall status run budget (below the external-check timeout)
+
+# LLD pruning
+LLD_PRUNE_GRACE_HOURS = 24  # Keep a PON discovered this long after its last ONU left
 
 # Prompt patterns
 PROMPT_LOGIN = b"Login:"
@@ -31,7 +53,9 @@ CMD_CD_CARD = "cd card"
 CMD_CD_UP = "cd .."
 CMD_TERMINAL_LENGTH_0 = "terminal length 0"
 CMD_SHOW_AUTH_ALL = "show authorization slot all pon all"
+CMD_SHOW_AUTH_SLOT = "show authorization slot {slot} pon all"
 CMD_SHOW_SIGNAL = "show optic_module_para slot {slot} pon {pon}"
+CMD_SHOW_ONU_LAST_OFF = "show onu_last_on_and_off_time slot {slot} pon {pon} onu {onu}"
 CMD_QUIT = "quit"
 CMD_EN = "EN"
 
@@ -41,11 +65,56 @@ PATTERN_ONU_STATUS = re.compile(
     r'^(\d+)\s+(\d+)\s+(\d+)\s+\S+\s+\S+\s+\S+\s+(up|dn)\b'
 )
 
+# Full ONU row: slot, pon, onu, type, status, phy id
+PATTERN_ONU_RECORD = re.compile(
+    r'^(\d+)\s+(\d+)\s+(\d+)\s+(\S+)\s+\S+\s+\S+\s+(up|dn)\s+(\S+)'
+)
+
 # Signal line: "1       -27.53  (Dbm)"
 PATTERN_SIGNAL = re.compile(
     r'^\d+\s+(-\d+\.\d+)\s+\(Dbm\)'
 )
 
+# Signal line keeping the ONU number
+PATTERN_ONU_SIGNAL = re.compile(
+    r'^(\d+)\s+(-\d+\.\d+)\s+\(Dbm\)'
+)
+
+# Optic module header line: "TEMPERATURE  : 47.38    ('C)"
+PATTERN_OPTIC_PARAM = re.compile(
+    r'^([A-Za-z][A-Za-z_ ]*?)\s*:\s*(-?\d+(?:\.\d+)?)\s*\(([^)]*)\)'
+)
+
+# Optic module header names mapped to PONOptics fields
+OPTIC_PARAM_FIELDS = {
+    "TYPE": "type_km",
+    "TEMPERATURE": "temperature",
+    "VOLTAGE": "voltage",
+    "BIAS CURRENT": "bias_current",
+    "BIAS_CURRENT": "bias_current",
+    "SEND POWER": "tx_power",
+    "TX POWER": "tx_power",
+    "TX_POWER": "tx_power",
+}
+
+# ONU detail line: "Last Down Cause : LOS" / "Last Off Time = 2024-05-01 10:00:00"
+PATTERN_ONU_DETAIL = re.compile(
+    r'^([A-Za-z][A-Za-z_ ()]*?)\s*[:=]\s*(\S.*?)\s*$'
+)
+
+# ONU detail names mapped to drill-down fields
+ONU_DETAIL_FIELDS = {
+    "LAST DOWN CAUSE": "last_down_cause",
+    "LAST DOWN REASON": "last_down_cause",
+    "LAST_DOWN_CAUSE": "last_down_cause",
+    "LAST DOWN TIME": "last_down_time",
+    "LAST OFF TIME": "last_down_time",
+    "LAST_DOWN_TIME": "last_down_time",
+    "DISTANCE": "distance",
+    "DISTANCE(M)": "distance",
+    "DISTANCE (M)": "distance",
+}
+
 # SNMP OIDs
 OID_PON_PORT_NAME = "1.3.6.1.4.1.5875.800.3.9.3.4.1.2"
 OID_PON_PORT_DESCRIPTION = "1.3.6.1.4.1.5875.800.3.9.3.4.1.3"
@@ -68,6 +137,17 @@ class PONStats:
     provisioned: int = 0
 
 
+@dataclass(frozen=True)
+class ONURecord:
+    """One ONU row from the authorization table."""
+    slot: str
+    pon: str
+    onu: str
+    onu_type: str
+    status: str
+    phy_id: str
+
+
 @dataclass(frozen=True)
 class PONSignals:
     """Optical signal statistics for a single PON port."""
@@ -78,3 +158,16 @@ class PONSignals:
     poor_signal: float = 0.0
     median_signal: float = 0.0
     onu_count: int = 0
+
+
+@dataclass(frozen=True)
+class PONOptics:
+    """PON transceiver parameters from the optic module header."""
+    slot: str
+    pon: str
+    pon_name: str
+    type_km: float | None = None
+    temperature: float | None = None
+    voltage: float | None = None
+    bias_current: float | None = None
+    tx_power: float | None = None
@@ -0,0 +1,117 @@
+"""
+Model/firmware CLI dialects for Fiberhome OLTs.
+
+A dialect bundles everything that can differ between chassis models and
+firmware lines: prompt pattern, privilege escalation, session setup,
+command templates and parser bindings. The collectors pass one to
+FiberhomeClient. AN5516-01 and AN5116-06B both speak the RP1000 command
+set, so DEFAULT_DIALECT is the only one defined; a firmware with different
+commands or prompts gets its own Dialect, passed in the same way.
+
+Commands missing from a dialect are treated as unsupported and skipped
+without a round trip. The per-ONU "onu_detail" drill-down command (with
+{slot}, {pon} and {onu} placeholders) is optional. Its RP1000 syntax is not
+yet confirmed on hardware, so it is opt-in per OLT (FIBERHOME_ONU_DETAIL,
+see select_dialect).
+"""
+
+import os
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any
+
+try:
+    from .constants import (
+        CMD_CD_CARD,
+        CMD_CD_ONU,
+        CMD_CD_SERVICE,
+        CMD_CD_UP,
+        CMD_EN,
+        CMD_SHOW_AUTH_ALL,
+        CMD_SHOW_AUTH_SLOT,
+        CMD_SHOW_ONU_LAST_OFF,
+        CMD_SHOW_SIGNAL,
+        CMD_TERMINAL_LENGTH_0,
+    )
+    from .parsers import parse_onu_authorization, parse_onu_detail, parse_pon_signals
+except ImportError:
+    from constants import (
+        CMD_CD_CARD,
+        CMD_CD_ONU,
+        CMD_CD_SERVICE,
+        CMD_CD_UP,
+        CMD_EN,
+        CMD_SHOW_AUTH_ALL,
+        CMD_SHOW_AUTH_SLOT,
+        CMD_SHOW_ONU_LAST_OFF,
+        CMD_SHOW_SIGNAL,
+        CMD_TERMINAL_LENGTH_0,
+    )
+    from parsers import parse_onu_authorization, parse_onu_detail, parse_pon_signals
+
+RP1000_PROMPT_PATTERN = r"(?:User>|Admin#|Admin\\service#|Admin\\onu#|Admin\\card#)\s*$"
+
+RP1000_COMMANDS = MappingProxyType(
+    {
+        "onu_context": CMD_CD_ONU,
+        "card_context": CMD_CD_CARD,
+        "leave_context": CMD_CD_UP,
+        "auth_all": CMD_SHOW_AUTH_ALL,
+        "auth_slot": CMD_SHOW_AUTH_SLOT,
+        "signal": CMD_SHOW_SIGNAL,
+    }
+)
+
+
+@dataclass(frozen=True)
+class Dialect:
+    """CLI dialect of one OLT model/firmware line."""
+    name: str
+    prompt_pattern: str
+    admin_prompt: str = "Admin#"
+    enable_command: str = CMD_EN
+    enable_prompt: str = "assword:"
+    setup_commands: tuple[str, ...] = (CMD_CD_SERVICE, CMD_TERMINAL_LENGTH_0, CMD_CD_UP)
+    commands: Mapping[str, str] = field(default_factory=lambda: RP1000_COMMANDS)
+    parse_authorization: Callable[[str], Any] = parse_onu_authorization
+    parse_signals: Callable[[str, str, str], Any] = parse_pon_signals
+    parse_onu_detail: Callable[[str], dict[str, str]] = parse_onu_detail
+
+    def supports(self, command: str) -> bool:
+        """Return True when the dialect defines the named command."""
+        return command in self.commands
+
+    def command(self, command: str, **params: str) -> str:
+        """Render a named command template."""
+        return self.commands[command].format(**params)
+
+
+DEFAULT_DIALECT = Dialect(
+    name="default",
+    prompt_pattern=RP1000_PROMPT_PATTERN,
+)
+
+ONU_DETAIL_ENV = "FIBERHOME_ONU_DETAIL"
+
+# RP1000 plus the per-ONU drill-down command, pending hardware confirmation.
+RP1000_DETAIL_DIALECT = replace(
+    DEFAULT_DIALECT,
+    name="rp1000-detail",
+    commands=MappingProxyType({**RP1000_COMMANDS, "onu_detail": CMD_SHOW_ONU_LAST_OFF}),
+)
+
+
+def select_dialect(olt: str) -> Dialect:
+    """
+    Return the dialect for one OLT.
+
+    FIBERHOME_ONU_DETAIL=1 enables the per-ONU drill-down on every OLT,
+    FIBERHOME_ONU_DETAIL=10.0.0.1,10.0.0.2 only on these OLTs.
+    """
+    selected = os.environ.get(ONU_DETAIL_ENV, "")
+    if selected.lower() in ("1", "true", "all") or olt in {
+        item.strip() for item in selected.split(",") if item.strip()
+    }:
+        return RP1000_DETAIL_DIALECT
+    return DEFAULT_DIALECT
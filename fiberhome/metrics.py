@@ -0,0 +1,277 @@
+"""
+Prometheus metrics rendered from cached collection results.
+
+The status and signals collectors save their last successful response (and
+the outcome of the latest attempt) to the state store. MetricsCache turns
+those documents into Prometheus text exposition format with olt/slot/pon
+labels. Each OLT's samples are rendered once per state file change and
+cached per metric family, so a scrape only re-renders OLTs that collected
+since the previous scrape and joins cached text for the rest.
+"""
+
+import logging
+import threading
+from collections.abc import Iterator
+from datetime import datetime
+from time import time
+from typing import Any
+
+try:
+    from .state import load_state, save_state, state_dir
+except ImportError:
+    from state import load_state, save_state, state_dir
+
+logger = logging.getLogger(__name__)
+
+COLLECTORS = ("status", "signals")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (family, type, help, section of data, field)
+PON_METRICS = (
+    ("fiberhome_pon_onus_online", "gauge", "ONUs online per PON.", "pon_ports", "online"),
+    ("fiberhome_pon_onus_offline", "gauge", "ONUs offline per PON.", "pon_ports", "offline"),
+    (
+        "fiberhome_pon_onus_provisioned",
+        "gauge",
+        "ONUs provisioned per PON.",
+        "pon_ports",
+        "provisioned",
+    ),
+    (
+        "fiberhome_pon_status_age_seconds",
+        "gauge",
+        "Age of the PON counts when collected (non-zero for slots kept from an earlier run).",
+        "pon_ports",
+        "age",
+    ),
+    (
+        "fiberhome_pon_rx_power_best_dbm",
+        "gauge",
+        "Best ONU RECV_POWER per PON.",
+        "pon_signals",
+        "best_signal",
+    ),
+    (
+        "fiberhome_pon_rx_power_median_dbm",
+        "gauge",
+        "Median ONU RECV_POWER per PON.",
+        "pon_signals",
+        "median_signal",
+    ),
+    (
+        "fiberhome_pon_rx_power_worst_dbm",
+        "gauge",
+        "Worst ONU RECV_POWER per PON.",
+        "pon_signals",
+        "poor_signal",
+    ),
+    (
+        "fiberhome_pon_signals_age_seconds",
+        "gauge",
+        "Age of the PON signal reading when collected.",
+        "pon_signals",
+        "age",
+    ),
+    (
+        "fiberhome_pon_optic_temperature_celsius",
+        "gauge",
+        "PON transceiver temperature.",
+        "pon_optics",
+        "temperature",
+    ),
+    (
+        "fiberhome_pon_optic_voltage_volts",
+        "gauge",
+        "PON transceiver voltage.",
+        "pon_optics",
+        "voltage",
+    ),
+    (
+        "fiberhome_pon_optic_bias_current_milliamperes",
+        "gauge",
+        "PON transceiver bias current.",
+        "pon_optics",
+        "bias_current",
+    ),
+    (
+        "fiberhome_pon_optic_tx_power_dbm",
+        "gauge",
+        "PON transceiver TX power.",
+        "pon_optics",
+        "tx_power",
+    ),
+)
+
+COLLECTION_METRICS = (
+    (
+        "fiberhome_collection_success",
+        "gauge",
+        "Whether the latest collection attempt succeeded.",
+    ),
+    (
+        "fiberhome_collection_duration_seconds",
+        "gauge",
+        "Duration of the latest collection attempt.",
+    ),
+    (
+        "fiberhome_collection_timestamp_seconds",
+        "gauge",
+        "Unix time of the last successful collection.",
+    ),
+)
+
+AGE_METRIC = (
+    "fiberhome_collection_age_seconds",
+    "gauge",
+    "Seconds since the last successful collection (computed at scrape).",
+)
+
+
+def response_state(collector: str) -> str:
+    """Return the state document name holding a collector's last response."""
+    return f"last_{collector}"
+
+
+def save_last_response(olt: str, collector: str, response: dict[str, Any]) -> None:
+    """
+    Cache a collector response for the exporter.
+
+    A failed attempt keeps the previous successful response and only
+    records the failure, so PON metrics do not vanish on one bad poll.
+    Cache write errors are logged and never fail the collection.
+    """
+    metadata = response["data"]["metadata"]
+    attempt = {
+        "at": time(),
+        "success": metadata["success"],
+        "duration_ms": metadata["collection_time_ms"],
+    }
+    document: dict[str, Any] = {"attempt": attempt}
+    if metadata["success"]:
+        document["response"] = response
+    else:
+        document["response"] = load_state(olt, response_state(collector)).get("response")
+    try:
+        save_state(olt, response_state(collector), document)
+    except OSError as exc:
+        logger.warning("Failed to cache %s response for %s: %s", collector, olt, exc)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+def _timestamp(response: dict[str, Any]) -> float | None:
+    try:
+        return datetime.fromisoformat(response["data"]["metadata"]["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def render_olt(olt: str, collector: str, document: dict[str, Any]) -> dict[str, list[str]]:
+    """Render one OLT/collector document into sample lines per metric family."""
+    families: dict[str, list[str]] = {}
+    response = document.get("response") or {}
+    data = response.get("data", {})
+    olt_label = data.get("metadata", {}).get("olt_ip") or olt
+
+    for family, _, _, section, field in PON_METRICS:
+        for entry in data.get(section, []):
+            value = entry.get(field)
+            if value is None:
+                continue
+            labels = _labels(olt=olt_label, slot=entry["slot"], pon=entry["pon"])
+            families.setdefault(family, []).append(f"{family}{{{labels}}} {value}")
+
+    attempt = document.get("attempt", {})
+    labels = _labels(olt=olt_label, collector=collector)
+    if attempt:
+        families["fiberhome_collection_success"] = [
+            f"fiberhome_collection_success{{{labels}}} {int(bool(attempt['success']))}"
+        ]
+        families["fiberhome_collection_duration_seconds"] = [
+            f"fiberhome_collection_duration_seconds{{{labels}}} "
+            f"{attempt['duration_ms'] / 1000:.3f}"
+        ]
+    collected_at = _timestamp(response)
+    if collected_at is not None:
+        families["fiberhome_collection_timestamp_seconds"] = [
+            f"fiberhome_collection_timestamp_seconds{{{labels}}} {collected_at:.3f}"
+        ]
+    return families
+
+
+class MetricsCache:
+    """Incrementally rendered metrics for every OLT in the state store."""
+
+    def __init__(self) -> None:
+        # (olt dir, collector) -> (file version, families, age labels, collected_at)
+        self._entries: dict[tuple[str, str], tuple[Any, ...]] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        root = state_dir()
+        directories = [path for path in root.iterdir() if path.is_dir()] if root.is_dir() else []
+        entries = {}
+        for directory in directories:
+            for collector in COLLECTORS:
+                path = directory / f"{response_state(collector)}.json"
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                # Atomic saves replace the file, so the inode changes on every write.
+                version = (stat.st_mtime_ns, stat.st_ino)
+                key = (directory.name, collector)
+                cached = self._entries.get(key)
+                if cached is not None and cached[0] == version:
+                    entries[key] = cached
+                    continue
+                document = load_state(directory.name, response_state(collector))
+                response = document.get("response") or {}
+                olt = response.get("data", {}).get("metadata", {}).get("olt_ip") or directory.name
+                families = render_olt(directory.name, collector, document)
+                entries[key] = (
+                    version,
+                    {name: "\n".join(lines) for name, lines in families.items()},
+                    _labels(olt=olt, collector=collector),
+                    _timestamp(response),
+                )
+        self._entries = entries
+
+    def render(self, now: float | None = None) -> str:
+        """Return the full exposition text, re-rendering only changed OLTs."""
+        with self._lock:
+            self._refresh()
+            entries = list(self._entries.values())
+        now = time() if now is None else now
+
+        def family(name: str, kind: str, help_text: str, samples: Iterator[str]) -> Iterator[str]:
+            first = next(samples, None)
+            if first is None:
+                return
+            yield f"# HELP {name} {help_text}"
+            yield f"# TYPE {name} {kind}"
+            yield first
+            yield from samples
+
+        def cached(name: str) -> Iterator[str]:
+            for _, families, _, _ in entries:
+                chunk = families.get(name)
+                if chunk:
+                    yield chunk
+
+        lines: list[str] = []
+        for name, kind, help_text, *_ in PON_METRICS + COLLECTION_METRICS:
+            lines.extend(family(name, kind, help_text, cached(name)))
+        ages = (
+            f"{AGE_METRIC[0]}{{{labels}}} {max(0.0, now - collected_at):.0f}"
+            for _, _, labels, collected_at in entries
+            if collected_at is not None
+        )
+        lines.extend(family(*AGE_METRIC, ages))
+        return "\n".join(lines) + "\n"
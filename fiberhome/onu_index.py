@@ -0,0 +1,311 @@
+"""
+In-memory ONU index for local lookups.
+
+The status and signals collectors save each OLT's authorization table (ONU
+identity and state) to the state store, and the signals collector keeps the
+latest per-ONU RECV_POWER of each PON next to it. OnuIndex loads those
+documents into dictionaries keyed by PhyId, by slot/pon/onu and by PON,
+reloading an OLT only when its files change, so lookups never touch the
+OLT. Every result carries its age.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import monotonic, time
+from typing import Any
+
+try:
+    from .constants import ONURecord
+    from .state import load_state, save_state, state_dir
+except ImportError:
+    from constants import ONURecord
+    from state import load_state, save_state, state_dir
+
+logger = logging.getLogger(__name__)
+
+ONU_INDEX_STATE = "onu_index"
+ONU_SIGNALS_STATE = "onu_signals"
+# Written by fiberhome_olt_lld.py from the SNMP PON list.
+LLD_SLOTS_STATE = "lld_slots"
+INDEX_REFRESH_INTERVAL = 5.0
+
+
+def save_onu_records(
+    olt: str,
+    records: dict[tuple[str, str, str], ONURecord],
+    collected_at: float | None = None,
+    slot_collected_at: dict[str, float] | None = None,
+) -> None:
+    """
+    Persist one OLT's authorization table for the lookup index.
+
+    slot_collected_at keeps the original collection time of slots whose
+    rows were carried over from an earlier run; every other slot is
+    stamped with collected_at.
+    """
+    collected_at = collected_at if collected_at is not None else time()
+    carried = slot_collected_at or {}
+    save_state(
+        olt,
+        ONU_INDEX_STATE,
+        {
+            "olt": olt,
+            "collected_at": collected_at,
+            "slots": {
+                slot: carried.get(slot, collected_at)
+                for slot in sorted({r.slot for r in records.values()}, key=int)
+            },
+            "onus": [
+                [r.slot, r.pon, r.onu, r.onu_type, r.status, r.phy_id]
+                for r in records.values()
+            ],
+        },
+    )
+
+
+def save_onu_signals(
+    olt: str,
+    readings: dict[str, tuple[float, list[tuple[str, float]]]],
+    current: set[str],
+) -> None:
+    """
+    Merge the per-ONU RECV_POWER of the PONs refreshed in this run.
+
+    Args:
+        olt: OLT IP address
+        readings: pon_name -> (collected_at, [(onu, recv_power), ...])
+        current: pon_names still carrying ONUs; other PONs are dropped
+    """
+    pons = {
+        name: entry
+        for name, entry in load_state(olt, ONU_SIGNALS_STATE).get("pons", {}).items()
+        if name in current
+    }
+    for name, (collected_at, values) in readings.items():
+        pons[name] = {"collected_at": collected_at, "recv_power": dict(values)}
+    save_state(olt, ONU_SIGNALS_STATE, {"pons": pons})
+
+
+def _slot_times(document: dict[str, Any]) -> dict[str, float]:
+    # Documents written before per-slot times carry one time for every slot.
+    default = document.get("collected_at", 0.0)
+    times = document.get("slots", {})
+    return {slot: times.get(slot, default) for slot, *_ in document.get("onus", [])}
+
+
+def slot_collected_at(olt: str) -> dict[str, float]:
+    """Return when each slot of one OLT's cached authorization table was collected."""
+    return _slot_times(load_state(olt, ONU_INDEX_STATE))
+
+
+def occupied_pons(olt: str) -> tuple[dict[tuple[str, str], float], float | None]:
+    """
+    Return the (slot, pon) pairs carrying ONUs with their slot's collection
+    time, and when the authorization table was last saved.
+    """
+    document = load_state(olt, ONU_INDEX_STATE)
+    if not document:
+        return {}, None
+    times = _slot_times(document)
+    pons = {(slot, pon): times[slot] for slot, pon, *_ in document.get("onus", [])}
+    return pons, document["collected_at"]
+
+
+def load_onu_records(olt: str) -> dict[tuple[str, str, str], ONURecord]:
+    """Return one OLT's cached authorization table."""
+    return {
+        (slot, pon, onu): ONURecord(slot, pon, onu, onu_type, status, phy_id)
+        for slot, pon, onu, onu_type, status, phy_id in load_state(olt, ONU_INDEX_STATE).get(
+            "onus", []
+        )
+    }
+
+
+def remember_slots(olt: str, slots: set[str]) -> None:
+    """Cache the line-card slots with PON ports discovered by LLD."""
+    save_state(olt, LLD_SLOTS_STATE, {"slots": sorted(slots, key=int), "discovered_at": time()})
+
+
+def known_slots(olt: str) -> list[str]:
+    """Return the OLT's slots from the LLD cache and the ONU index, in order."""
+    slots = set(load_state(olt, LLD_SLOTS_STATE).get("slots", []))
+    slots.update(slot for slot, _ in occupied_pons(olt)[0])
+    return sorted(slots, key=int)
+
+
+@dataclass
+class _OltIndex:
+    olt: str
+    collected_at: float
+    mtimes: tuple[float, float]
+    slot_collected_at: dict[str, float] = field(default_factory=dict)
+    onus: dict[tuple[str, str, str], ONURecord] = field(default_factory=dict)
+    pons: dict[tuple[str, str], list[str]] = field(default_factory=dict)
+    recv_power: dict[tuple[str, str, str], tuple[float, float]] = field(default_factory=dict)
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _load_olt(directory: Path, mtimes: tuple[float, float]) -> _OltIndex | None:
+    name = directory.name
+    document = load_state(name, ONU_INDEX_STATE)
+    if not document:
+        return None
+
+    index = _OltIndex(
+        document.get("olt", name),
+        document.get("collected_at", 0.0),
+        mtimes,
+        _slot_times(document),
+    )
+    for slot, pon, onu, onu_type, status, phy_id in document.get("onus", []):
+        index.onus[(slot, pon, onu)] = ONURecord(slot, pon, onu, onu_type, status, phy_id)
+        index.pons.setdefault((slot, pon), []).append(onu)
+
+    for pon_name, entry in load_state(name, ONU_SIGNALS_STATE).get("pons", {}).items():
+        slot, _, pon = pon_name.partition("/")
+        for onu, power in entry.get("recv_power", {}).items():
+            index.recv_power[(slot, pon, onu)] = (power, entry["collected_at"])
+    return index
+
+
+class OnuIndex:
+    """Lookup index over the cached authorization tables of all OLTs."""
+
+    def __init__(self, refresh_interval: float = INDEX_REFRESH_INTERVAL) -> None:
+        self.refresh_interval = refresh_interval
+        # OLT and PhyId maps of the last refresh, swapped as one reference so
+        # a reader never pairs a new PhyId map with the previous OLT map.
+        self._view: tuple[
+            dict[str, _OltIndex], dict[str, list[tuple[str, tuple[str, str, str]]]]
+        ] = ({}, {})
+        self._refreshed_at: float | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Reload OLTs whose state files changed since the last refresh."""
+        root = state_dir()
+        directories = [path for path in root.iterdir() if path.is_dir()] if root.is_dir() else []
+        previous = self._view[0]
+        olts: dict[str, _OltIndex] = {}
+        changed = False
+
+        for directory in directories:
+            mtimes = (
+                _mtime(directory / f"{ONU_INDEX_STATE}.json"),
+                _mtime(directory / f"{ONU_SIGNALS_STATE}.json"),
+            )
+            current = previous.get(directory.name)
+            if current is not None and current.mtimes == mtimes:
+                olts[directory.name] = current
+                continue
+            # Directories without an authorization table (sender buffers, OLTs
+            # with only LLD state) are skipped without forcing a rebuild.
+            loaded = _load_olt(directory, mtimes) if mtimes[0] else None
+            if loaded is not None:
+                olts[directory.name] = loaded
+                changed = True
+
+        if changed or olts.keys() != previous.keys():
+            by_phy_id: dict[str, list[tuple[str, tuple[str, str, str]]]] = {}
+            for key, index in olts.items():
+                for position, record in index.onus.items():
+                    by_phy_id.setdefault(record.phy_id.upper(), []).append((key, position))
+            self._view = (olts, by_phy_id)
+            logger.info("ONU index refreshed: %s OLTs, %s ONUs", len(olts), len(by_phy_id))
+        self._refreshed_at = monotonic()
+
+    def maybe_refresh(self) -> None:
+        """Refresh when the last refresh is older than refresh_interval."""
+        if (
+            self._refreshed_at is not None
+            and monotonic() - self._refreshed_at < self.refresh_interval
+        ):
+            return
+        with self._lock:
+            if (
+                self._refreshed_at is None
+                or monotonic() - self._refreshed_at >= self.refresh_interval
+            ):
+                self.refresh()
+
+    def _olt(self, olt: str) -> tuple[str, _OltIndex] | None:
+        for key, index in self._view[0].items():
+            if olt in (key, index.olt):
+                return key, index
+        return None
+
+    def _result(self, index: _OltIndex, record: ONURecord, now: float) -> dict[str, Any]:
+        reading = index.recv_power.get((record.slot, record.pon, record.onu))
+        return {
+            "olt": index.olt,
+            "slot": record.slot,
+            "pon": record.pon,
+            "onu": record.onu,
+            "pon_name": f"{record.slot}/{record.pon}",
+            "onu_type": record.onu_type,
+            "status": record.status,
+            "phy_id": record.phy_id,
+            "age": max(
+                0,
+                round(now - index.slot_collected_at.get(record.slot, index.collected_at)),
+            ),
+            "recv_power": reading[0] if reading else None,
+            "signal_age": max(0, round(now - reading[1])) if reading else None,
+        }
+
+    def by_phy_id(self, phy_id: str) -> list[dict[str, Any]]:
+        """Return every ONU with this PhyId/serial (case-insensitive)."""
+        now = time()
+        olts, by_phy_id = self._view
+        results = []
+        for key, position in by_phy_id.get(phy_id.upper(), []):
+            # Guard anyway: an OLT may be dropped between two refreshes.
+            index = olts.get(key)
+            record = index.onus.get(position) if index else None
+            if record is not None:
+                results.append(self._result(index, record, now))
+        return results
+
+    def by_onu(self, olt: str, slot: str, pon: str, onu: str) -> dict[str, Any] | None:
+        """Return one ONU by OLT and slot/pon/onu position."""
+        found = self._olt(olt)
+        if found is None:
+            return None
+        record = found[1].onus.get((slot, pon, onu))
+        return self._result(found[1], record, time()) if record else None
+
+    def by_pon(self, olt: str, slot: str, pon: str) -> list[dict[str, Any]]:
+        """Return every ONU of one PON, ordered by ONU number."""
+        found = self._olt(olt)
+        if found is None:
+            return []
+        index = found[1]
+        now = time()
+        return [
+            self._result(index, index.onus[(slot, pon, onu)], now)
+            for onu in sorted(index.pons.get((slot, pon), []), key=int)
+        ]
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Return indexed OLTs with their ONU count and the age of their oldest slot."""
+        now = time()
+        return [
+            {
+                "olt": index.olt,
+                "onus": len(index.onus),
+                # The oldest slot, so carried-over rows are not reported as fresh.
+                "age": max(
+                    0,
+                    round(now - min(index.slot_collected_at.values(), default=index.collected_at)),
+                ),
+            }
+            for index in self._view[0].values()
+        ]
@@ -11,17 +11,33 @@ from typing import Any
 
 try:
     from .constants import (
+        PATTERN_ONU_RECORD,
+        PATTERN_ONU_SIGNAL,
+        PATTERN_ONU_DETAIL,
+        ONU_DETAIL_FIELDS,
+        OPTIC_PARAM_FIELDS,
+        PATTERN_OPTIC_PARAM,
         PATTERN_ONU_STATUS,
         PATTERN_SIGNAL,
+        ONURecord,
         PONStats,
+        PONOptics,
         PONSignals,
         ONUStatus,
     )
 except ImportError:
     from constants import (
+        PATTERN_ONU_RECORD,
+        PATTERN_ONU_SIGNAL,
+        PATTERN_ONU_DETAIL,
+        ONU_DETAIL_FIELDS,
+        OPTIC_PARAM_FIELDS,
+        PATTERN_OPTIC_PARAM,
         PATTERN_ONU_STATUS,
         PATTERN_SIGNAL,
+        ONURecord,
         PONStats,
+        PONOptics,
         PONSignals,
         ONUStatus,
     )
@@ -78,6 +94,91 @@ def parse_onu_authorization(output: str) -> dict[str, PONStats]:
     return result
 
 
+def parse_onu_records(output: str) -> dict[tuple[str, str, str], ONURecord]:
+    """
+    Parse ONU identity rows from 'show authorization slot all pon all'.
+
+    Args:
+        output: Raw CLI output
+
+    Returns:
+        Dict mapping (slot, pon, onu) to ONURecord
+    """
+    records: dict[tuple[str, str, str], ONURecord] = {}
+
+    for line in output.splitlines():
+        match = PATTERN_ONU_RECORD.match(line.strip())
+        if not match:
+            continue
+
+        slot, pon, onu, onu_type, status, phy_id = match.groups()
+        records[(slot, pon, onu)] = ONURecord(
+            slot=slot,
+            pon=pon,
+            onu=onu,
+            onu_type=onu_type,
+            status=status,
+            phy_id=phy_id,
+        )
+
+    return records
+
+
+def summarize_onu_records(
+    records: dict[tuple[str, str, str], ONURecord],
+) -> dict[str, PONStats]:
+    """
+    Count ONUs per PON from authorization rows, as parse_onu_authorization does.
+
+    Args:
+        records: Dict mapping (slot, pon, onu) to ONURecord
+
+    Returns:
+        Dict mapping pon_name (e.g., "1/1") to PONStats
+    """
+    counts: dict[tuple[str, str], list[int]] = {}
+    for record in records.values():
+        count = counts.setdefault((record.slot, record.pon), [0, 0])
+        count[0] += record.status == ONUStatus.ONLINE
+        count[1] += 1
+
+    return {
+        f"{slot}/{pon}": PONStats(
+            slot=slot,
+            pon=pon,
+            pon_name=f"{slot}/{pon}",
+            online=online,
+            offline=total - online,
+            provisioned=total,
+        )
+        for (slot, pon), (online, total) in counts.items()
+    }
+
+
+def parse_onu_signals(output: str) -> list[tuple[str, float]]:
+    """
+    Parse per-ONU RECV_POWER lines from 'show optic_module_para' output.
+
+    Args:
+        output: Raw CLI output
+
+    Returns:
+        List of (onu_no, recv_power_dbm) tuples
+    """
+    readings: list[tuple[str, float]] = []
+
+    for line in output.splitlines():
+        match = PATTERN_ONU_SIGNAL.match(line.strip())
+        if not match:
+            continue
+        try:
+            readings.append((match.group(1), float(match.group(2))))
+        except ValueError:
+            continue
+
+    return readings
+
+
 def parse_pon_signals(output: str, slot: str, pon: str) -> PONSignals | None:
     """
     Parse 'show optic_module_para slot X pon Y' output.
@@ -130,6 +231,78 @@ def parse_pon_signals(output: str, slot: str, pon: str) -> PONSignals | None:
     )
 
 
+def parse_pon_optics(output: str, slot: str, pon: str) -> PONOptics | None:
+    """
+    Parse the transceiver header of 'show optic_module_para slot X pon Y'.
+
+    Output format:
+        NAME          VALUE     UNIT
+        TYPE         : 20       (KM)
+        TEMPERATURE  : 47.38    ('C)
+        VOLTAGE      : 3.28     (V)
+        BIAS CURRENT : 22.42    (mA)
+        SEND POWER   : 4.52     (Dbm)
+
+    Args:
+        output: Raw CLI output
+        slot: Slot number
+        pon: PON port number
+
+    Returns:
+        PONOptics or None if no header fields found
+    """
+    values: dict[str, float] = {}
+
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("ONU_NO"):
+            break
+        match = PATTERN_OPTIC_PARAM.match(line)
+        if not match:
+            continue
+
+        field = OPTIC_PARAM_FIELDS.get(" ".join(match.group(1).upper().split()))
+        if field is None:
+            continue
+        try:
+            values[field] = float(match.group(2))
+        except ValueError:
+            continue
+
+    if not values:
+        return None
+
+    return PONOptics(slot=slot, pon=pon, pon_name=f"{slot}/{pon}", **values)
+
+
+def parse_onu_detail(output: str) -> dict[str, str]:
+    """
+    Parse per-ONU detail output (last down cause/time, distance).
+
+    Output format (one "name : value" per line, other lines ignored):
+        Last Down Cause : LOS
+        Last Down Time  : 2024-05-01 10:00:00
+        Distance(m)     : 1532
+
+    Args:
+        output: Raw CLI output
+
+    Returns:
+        Dict with the recognized fields (see ONU_DETAIL_FIELDS)
+    """
+    details: dict[str, str] = {}
+
+    for line in output.splitlines():
+        match = PATTERN_ONU_DETAIL.match(line.strip())
+        if not match:
+            continue
+        field = ONU_DETAIL_FIELDS.get(" ".join(match.group(1).upper().split()))
+        if field is not None and field not in details:
+            details[field] = match.group(2)
+
+    return details
+
+
 def extract_pon_pairs(output: str) -> set[tuple[str, str]]:
     """
     Extract unique (slot, pon) pairs from authorization output.
@@ -0,0 +1,141 @@
+"""
+Opt-in profiling capture for collector runs.
+
+Enabled without touching the Zabbix item key, either by environment or by
+flag file:
+
+    FIBERHOME_PROFILE=1                  profile every OLT
+    FIBERHOME_PROFILE=10.0.0.1,10.0.0.2  profile only these OLTs
+    <profile dir>/enabled                profile every OLT
+    <profile dir>/<olt>/enabled          profile one OLT
+
+Each profiled run writes a cProfile dump (.prof) and a text summary with
+wall time, pre-run CPU time (interpreter startup and imports), the
+tracemalloc peak and the top allocation sites to <profile dir>/<olt>/,
+keeping the newest PROFILE_KEEP runs. When disabled, the only cost is one
+environment lookup and two stat() calls.
+"""
+
+import logging
+import os
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter, process_time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = "FIBERHOME_PROFILE"
+PROFILE_DIR_ENV = "FIBERHOME_PROFILE_DIR"
+PROFILE_FLAG = "enabled"
+PROFILE_KEEP = 10
+PROFILE_TOP_FUNCTIONS = 30
+PROFILE_TOP_ALLOCATIONS = 15
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def profile_dir() -> Path:
+    """Return the root profile directory (overridable via FIBERHOME_PROFILE_DIR)."""
+    override = os.environ.get(PROFILE_DIR_ENV)
+    if override:
+        return Path(override)
+    return Path(__file__).resolve().parent / ".profiles"
+
+
+def _olt_dir(olt: str) -> Path:
+    return profile_dir() / _UNSAFE_CHARS.sub("_", olt)
+
+
+def profiling_enabled(olt: str) -> bool:
+    """Return True when profiling is requested for this OLT."""
+    selected = os.environ.get(PROFILE_ENV, "")
+    if selected:
+        if selected.lower() in ("1", "true", "all"):
+            return True
+        return olt in {item.strip() for item in selected.split(",")}
+    return (profile_dir() / PROFILE_FLAG).exists() or (_olt_dir(olt) / PROFILE_FLAG).exists()
+
+
+def _rotate(directory: Path, name: str, keep: int) -> None:
+    runs = sorted(directory.glob(f"{name}-*.prof"), reverse=True)
+    for stale in runs[keep:]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".txt").unlink(missing_ok=True)
+
+
+def _write_profile(
+    name: str,
+    olt: str,
+    keep: int,
+    profiler: Any,
+    wall_ms: float,
+    startup_cpu: float,
+    peak: int,
+    snapshot: Any,
+) -> None:
+    import io
+    import pstats
+
+    directory = _olt_dir(olt)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    base = directory / f"{name}-{stamp}"
+    profiler.dump_stats(base.with_suffix(".prof"))
+
+    stats_text = io.StringIO()
+    pstats.Stats(profiler, stream=stats_text).sort_stats("cumulative").print_stats(
+        PROFILE_TOP_FUNCTIONS
+    )
+    allocations = snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]
+    summary = [
+        f"run: {name} olt: {olt} at: {stamp}",
+        f"wall_ms: {wall_ms:.1f}",
+        f"startup_cpu_ms: {startup_cpu * 1000:.1f}",
+        f"tracemalloc_peak_kib: {peak / 1024:.1f}",
+        "",
+        "top allocations:",
+        *(str(stat) for stat in allocations),
+        "",
+        stats_text.getvalue(),
+    ]
+    base.with_suffix(".txt").write_text("\n".join(summary), encoding="utf-8")
+    _rotate(directory, name, keep)
+    logger.info("Profile written for olt=%s run=%s path=%s", olt, name, base)
+
+
+@contextmanager
+def capture_profile(name: str, olt: str, keep: int = PROFILE_KEEP) -> Iterator[None]:
+    """
+    Profile the enclosed block for one OLT when profiling is enabled.
+
+    Failing to write the profile is logged and never changes the result or
+    exception of the enclosed block.
+    """
+    if not profiling_enabled(olt):
+        yield
+        return
+
+    import cProfile
+    import tracemalloc
+
+    startup_cpu = process_time()
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    started_at = perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        wall_ms = (perf_counter() - started_at) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        try:
+            _write_profile(name, olt, keep, profiler, wall_ms, startup_cpu, peak, snapshot)
+        except OSError as exc:
+            logger.warning("Failed to write profile for olt=%s run=%s: %s", olt, name, exc)
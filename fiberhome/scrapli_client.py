@@ -1,56 +1,80 @@
 """
-Async Telnet client for Fiberhome OLT using Scrapli.
+Async Telnet/SSH client for Fiberhome OLT using Scrapli.
 """
 
+import asyncio
 import logging
+from collections.abc import Callable
 from time import perf_counter
+from typing import Any
 
 from scrapli.driver.generic.async_driver import AsyncGenericDriver
 
 try:
-    from .constants import (
-        CMD_CD_CARD,
-        CMD_CD_ONU,
-        CMD_CD_SERVICE,
-        CMD_CD_UP,
-        CMD_SHOW_AUTH_ALL,
-        CMD_SHOW_SIGNAL,
-        CMD_TERMINAL_LENGTH_0,
-        TELNET_TIMEOUT,
-    )
+    from .constants import AUTH_SLOT_TIMEOUT, CMD_TIMEOUT_SIGNAL, TELNET_TIMEOUT
+    from .dialects import DEFAULT_DIALECT, Dialect
 except ImportError:
-    from constants import (
-        CMD_CD_CARD,
-        CMD_CD_ONU,
-        CMD_CD_SERVICE,
-        CMD_CD_UP,
-        CMD_SHOW_AUTH_ALL,
-        CMD_SHOW_SIGNAL,
-        CMD_TERMINAL_LENGTH_0,
-        TELNET_TIMEOUT,
-    )
+    from constants import AUTH_SLOT_TIMEOUT, CMD_TIMEOUT_SIGNAL, TELNET_TIMEOUT
+    from dialects import DEFAULT_DIALECT, Dialect
 
 logger = logging.getLogger(__name__)
 
-PROMPT_PATTERN = r"(?:User>|Admin#|Admin\\service#|Admin\\onu#|Admin\\card#)\s*$"
+PROMPT_PATTERN = DEFAULT_DIALECT.prompt_pattern
+
+TRANSPORT_TELNET = "telnet"
+TRANSPORT_SSH = "ssh"
+SSH_COMPRESSION_ALGS = ["zlib@openssh.com", "zlib", "none"]
+
+
+def parse_port_spec(spec: str | int) -> tuple[str, int, bool]:
+    """
+    Parse a port macro value into (transport, port, compression).
+
+    "23" -> Telnet on 23, "ssh:22" -> SSH on 22, "ssh+zlib:22" -> SSH on 22
+    with stream compression. This keeps the Zabbix item key unchanged: only
+    the {$OLT_PORT} macro value selects the transport.
+    """
+    text = str(spec).strip()
+    if ":" not in text:
+        return TRANSPORT_TELNET, int(text), False
+
+    scheme, _, port = text.partition(":")
+    scheme = scheme.lower()
+    if scheme not in (TRANSPORT_SSH, f"{TRANSPORT_SSH}+zlib"):
+        raise ValueError(f"Unsupported transport in port spec: {spec}")
+    return TRANSPORT_SSH, int(port), scheme.endswith("+zlib")
 
 
 class FiberhomeClient:
-    """Async client for Fiberhome OLT via Telnet using Scrapli."""
+    """Async client for Fiberhome OLT via Telnet or SSH using Scrapli."""
 
     def __init__(
         self,
         host: str,
         username: str,
         password: str,
-        port: int = 23,
+        port: int | str = 23,
         timeout: int = TELNET_TIMEOUT,
+        transport_wrapper: Callable[[Any], Any] | None = None,
+        dialect: Dialect = DEFAULT_DIALECT,
+        transport: str = TRANSPORT_TELNET,
+        compression: bool = False,
     ) -> None:
         self.host = host
         self.username = username
         self.password = password
-        self.port = port
+        spec_transport, self.port, spec_compression = parse_port_spec(port)
+        if spec_transport == TRANSPORT_SSH:
+            transport = TRANSPORT_SSH
+            compression = compression or spec_compression
         self.timeout = timeout
+        self.transport_wrapper = transport_wrapper
+        self.dialect = dialect
+        self.transport = transport
+        self.compression = compression
+        # Cleared when a command fails or a context is left open, so a
+        # session pool never hands out a session in an unknown state.
+        self.reusable = False
         self._driver: AsyncGenericDriver | None = None
 
     async def __aenter__(self) -> "FiberhomeClient":
@@ -61,6 +85,8 @@ class FiberhomeClient:
         await self.disconnect()
 
     def _build_driver(self) -> AsyncGenericDriver:
+        if self.transport == TRANSPORT_SSH:
+            return self._build_ssh_driver()
         return AsyncGenericDriver(
             host=self.host,
             port=self.port,
@@ -72,35 +98,69 @@ class FiberhomeClient:
             timeout_socket=self.timeout,
             timeout_transport=self.timeout,
             timeout_ops=self.timeout,
-            comms_prompt_pattern=PROMPT_PATTERN,
+            comms_prompt_pattern=self.dialect.prompt_pattern,
             comms_return_char="\n",
             comms_roughly_match_inputs=False,
             transport="asynctelnet",
             transport_options={"ptyprocess": False},
         )
 
+    def _build_ssh_driver(self) -> AsyncGenericDriver:
+        # asyncssh is an optional dependency; Scrapli imports it lazily here.
+        return AsyncGenericDriver(
+            host=self.host,
+            port=self.port,
+            auth_username=self.username,
+            auth_password=self.password,
+            auth_strict_key=False,
+            timeout_socket=self.timeout,
+            timeout_transport=self.timeout,
+            timeout_ops=self.timeout,
+            comms_prompt_pattern=self.dialect.prompt_pattern,
+            comms_return_char="\n",
+            comms_roughly_match_inputs=False,
+            transport="asyncssh",
+            transport_options={
+                "asyncssh": {
+                    "compression_algs": SSH_COMPRESSION_ALGS if self.compression else ["none"],
+                },
+            },
+        )
+
     async def connect(self) -> None:
-        """Open the Telnet session, elevate to admin, and disable paging."""
+        """Open the session, elevate to admin, and disable paging."""
         if self._driver is not None:
             return
 
         started_at = perf_counter()
-        logger.info("Connecting to host=%s port=%s", self.host, self.port)
+        logger.info(
+            "Connecting to host=%s port=%s transport=%s dialect=%s",
+            self.host,
+            self.port,
+            self.transport,
+            self.dialect.name,
+        )
         driver = self._build_driver()
+        if self.transport_wrapper is not None:
+            # Swap the transport (e.g. transcript record/replay) before opening.
+            driver.transport = self.transport_wrapper(driver.transport)
+            driver.channel.transport = driver.transport
         await driver.open()
 
         prompt = await driver.get_prompt()
-        if "Admin#" not in prompt:
+        dialect = self.dialect
+        if dialect.admin_prompt not in prompt:
             await driver.send_interactive(
                 [
-                    ("EN", "assword:", False),
-                    (self.password, "Admin#", True),
+                    (dialect.enable_command, dialect.enable_prompt, False),
+                    (self.password, dialect.admin_prompt, True),
                 ],
-                interaction_complete_patterns=[PROMPT_PATTERN],
+                interaction_complete_patterns=[dialect.prompt_pattern],
             )
 
         self._driver = driver
         await self._setup_terminal()
+        self.reusable = True
         elapsed_ms = round((perf_counter() - started_at) * 1000)
         logger.info(
             "Connected to host=%s result=success duration_ms=%s",
@@ -109,9 +169,8 @@ class FiberhomeClient:
         )
 
     async def _setup_terminal(self) -> None:
-        await self.send_command(CMD_CD_SERVICE)
-        await self.send_command(CMD_TERMINAL_LENGTH_0)
-        await self.send_command(CMD_CD_UP)
+        for command in self.dialect.setup_commands:
+            await self.send_command(command)
 
     async def send_command(self, command: str, timeout: float | None = None) -> str:
         """Send a command and return the parsed text result."""
@@ -119,7 +178,12 @@ class FiberhomeClient:
             raise RuntimeError("Not connected")
 
         started_at = perf_counter()
-        response = await self._driver.send_command(command, timeout_ops=timeout)
+        try:
+            response = await self._driver.send_command(command, timeout_ops=timeout)
+        except BaseException:
+            # The command's output may still arrive on this channel.
+            self.reusable = False
+            raise
         elapsed_ms = round((perf_counter() - started_at) * 1000)
         logger.debug(
             "Command complete host=%s action=%s result=success duration_ms=%s",
@@ -129,21 +193,125 @@ class FiberhomeClient:
         )
         return response.result
 
-    async def collect_onu_authorization(self) -> str:
-        await self.send_command(CMD_CD_ONU)
-        output = await self.send_command(CMD_SHOW_AUTH_ALL, timeout=self.timeout + 25)
-        await self.send_command(CMD_CD_UP)
+    async def collect_onu_authorization(self, timeout: float | None = None) -> str:
+        await self.send_command(self.dialect.command("onu_context"))
+        output = await self.send_command(
+            self.dialect.command("auth_all"),
+            timeout=timeout if timeout is not None else self.timeout + 25,
+        )
+        await self.send_command(self.dialect.command("leave_context"))
         return output
 
-    async def collect_pon_signals(self, slot: str, pon: str) -> str:
-        await self.send_command(CMD_CD_CARD)
+    async def collect_onu_authorization_slot(
+        self,
+        slot: str,
+        timeout: float = AUTH_SLOT_TIMEOUT,
+        deadline_at: float | None = None,
+    ) -> str:
+        """
+        Run the dialect's authorization query for one line-card slot.
+
+        No command, including the context switches around the query, is
+        started or allowed to run past deadline_at (perf_counter).
+        """
+
+        def remaining(limit: float) -> float:
+            if deadline_at is None:
+                return limit
+            left = min(limit, deadline_at - perf_counter())
+            if left <= 0:
+                self.reusable = False
+                raise TimeoutError(f"Deadline reached during slot {slot}")
+            return left
+
+        await self.send_command(
+            self.dialect.command("onu_context"), timeout=remaining(self.timeout)
+        )
         output = await self.send_command(
-            CMD_SHOW_SIGNAL.format(slot=slot, pon=pon),
-            timeout=15,
+            self.dialect.command("auth_slot", slot=slot),
+            timeout=remaining(timeout),
+        )
+        await self.send_command(
+            self.dialect.command("leave_context"), timeout=remaining(self.timeout)
         )
-        await self.send_command(CMD_CD_UP)
         return output
 
+    async def collect_onu_details(
+        self,
+        positions: list[tuple[str, str, str]],
+        timeout: float = CMD_TIMEOUT_SIGNAL,
+        deadline_at: float | None = None,
+    ) -> dict[tuple[str, str, str], str | None]:
+        """
+        Run the dialect's per-ONU detail command for each (slot, pon, onu).
+
+        Every position whose command was sent is in the result; an ONU whose
+        command failed maps to None. The first failure ends the drill-down
+        (the channel may still hold that command's output), and no command
+        is started or allowed to run past deadline_at (perf_counter).
+        """
+
+        def time_left() -> float:
+            return deadline_at - perf_counter() if deadline_at is not None else timeout
+
+        outputs: dict[tuple[str, str, str], str | None] = {}
+        await self.send_command(
+            self.dialect.command("onu_context"), timeout=min(timeout, time_left())
+        )
+        for slot, pon, onu in positions:
+            remaining = min(timeout, time_left())
+            if remaining <= 0:
+                break
+            try:
+                outputs[(slot, pon, onu)] = await self.send_command(
+                    self.dialect.command("onu_detail", slot=slot, pon=pon, onu=onu),
+                    timeout=remaining,
+                )
+            except Exception as exc:
+                outputs[(slot, pon, onu)] = None
+                logger.warning(
+                    "ONU detail failed host=%s onu=%s/%s/%s error=%s; stopping drill-down",
+                    self.host,
+                    slot,
+                    pon,
+                    onu,
+                    exc,
+                )
+                return outputs
+        remaining = min(timeout, time_left())
+        if remaining > 0:
+            await self.send_command(self.dialect.command("leave_context"), timeout=remaining)
+        else:
+            # Past the deadline the caller closes the session instead.
+            self.reusable = False
+        return outputs
+
+    async def collect_pon_signals(
+        self,
+        slot: str,
+        pon: str,
+        timeout: float = CMD_TIMEOUT_SIGNAL,
+    ) -> str:
+        await self.send_command(self.dialect.command("card_context"))
+        output = await self.send_command(
+            self.dialect.command("signal", slot=slot, pon=pon),
+            timeout=timeout,
+        )
+        await self.send_command(self.dialect.command("leave_context"))
+        return output
+
+    async def is_alive(self, timeout: float = 5) -> bool:
+        """Return whether an open session still answers with a prompt."""
+        if self._driver is None or not self.reusable:
+            return False
+        try:
+            await asyncio.wait_for(self._driver.get_prompt(), timeout)
+        except Exception as exc:
+            logger.info("Dropping stale session host=%s error=%s", self.host, exc)
+            self.reusable = False
+            return False
+        return True
+
     async def disconnect(self) -> None:
         """Close the underlying Scrapli driver."""
         if self._driver is None:
@@ -152,6 +320,7 @@ class FiberhomeClient:
         started_at = perf_counter()
         driver = self._driver
         self._driver = None
+        self.reusable = False
         try:
             await driver.close()
         finally:
@@ -0,0 +1,60 @@
+"""
+Per-OLT persistent state for collectors.
+
+Small JSON documents stored under a state directory, one subdirectory per
+OLT. Writes are atomic (temp file + rename) so a collector killed by the
+Zabbix timeout never leaves a truncated file behind.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR_ENV = "FIBERHOME_STATE_DIR"
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def state_dir() -> Path:
+    """Return the root state directory (overridable via FIBERHOME_STATE_DIR)."""
+    override = os.environ.get(STATE_DIR_ENV)
+    if override:
+        return Path(override)
+    return Path(__file__).resolve().parent / ".state"
+
+
+def olt_state_dir(olt: str) -> Path:
+    """Return the state directory for one OLT."""
+    return state_dir() / _UNSAFE_CHARS.sub("_", olt)
+
+
+def load_state(olt: str, name: str) -> dict[str, Any]:
+    """Load a state document, returning an empty dict when missing or corrupt."""
+    path = olt_state_dir(olt) / f"{name}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable state file=%s error=%s", path, exc)
+        return {}
+
+
+def save_state(olt: str, name: str, data: dict[str, Any]) -> None:
+    """Atomically write a state document."""
+    directory = olt_state_dir(olt)
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, separators=(",", ":"))
+        os.replace(tmp_path, directory / f"{name}.json")
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,320 @@
+"""
+Recorded OLT session transcripts and a replay transport for Scrapli.
+
+A transcript is a gzip-compressed JSON-lines file. The first line is a
+header, every following line is one transport event:
+
+    {"version": 1, "host": "olt-01", "model": "AN5516-01", ...}
+    {"t": 0.0132, "op": "r", "data": "Login:"}
+    {"t": 0.0140, "op": "w", "data": "<redacted>"}
+
+Chunk boundaries and offsets (seconds since open) are preserved, so a
+replay can run either at full speed or at the recorded pace.
+
+Recordings are redacted before they are written: credentials become
+"<redacted>" in writes and asterisks in reads, and in the read stream the
+login banner, hostnames/IPs and ONU serial numbers are masked. Read
+redaction preserves length, so chunk boundaries stay where they were and
+serials keep a consistent pseudonym that the parsers still accept.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from time import monotonic
+from typing import Any
+
+from scrapli.exceptions import ScrapliConnectionError
+from scrapli.transport.base.async_transport import AsyncTransport
+
+TRANSCRIPT_VERSION = 1
+REDACTED = b"<redacted>"
+MASK = b"*"
+
+# Prompts that end the pre-login banner (Telnet login, or CLI prompt over SSH).
+BANNER_END = re.compile(rb"Login:|login:|Username:|User>|Admin#")
+# Authorization row up to the PhyId: vendor prefix, then the serial proper.
+PATTERN_PHY_ID = re.compile(
+    rb"^([ \t]*(?:\d+[ \t]+){3}(?:\S+[ \t]+){3}(?:up|dn)[ \t]+[A-Za-z]{4})([0-9A-Za-z]+)",
+    re.MULTILINE,
+)
+
+TransportWrapper = Callable[[AsyncTransport], Any]
+
+
+@dataclass(frozen=True)
+class TranscriptEvent:
+    """One read or write on the transport."""
+    offset: float
+    op: str
+    data: bytes
+
+
+def _mask(data: bytes) -> bytes:
+    return re.sub(rb"[^\r\n]", MASK, data)
+
+
+def _pseudonym(serial: bytes) -> bytes:
+    digest = hashlib.sha256(serial).hexdigest().encode()
+    return (digest * (len(serial) // len(digest) + 1))[: len(serial)]
+
+
+def scrub_stream(data: bytes, identifiers: Iterable[str] = ()) -> bytes:
+    """
+    Redact the session output of a recording without changing its length.
+
+    Masks the login banner (everything before the first login or CLI
+    prompt) and every identifier (credentials, hostnames, IPs), and
+    replaces ONU serials with a stable pseudonym of the same length.
+    """
+    prompt = BANNER_END.search(data)
+    if prompt is not None and prompt.start() > 0:
+        data = _mask(data[: prompt.start()]) + data[prompt.start():]
+    for identifier in sorted({i for i in identifiers if i}, key=len, reverse=True):
+        secret = identifier.encode()
+        data = data.replace(secret, MASK * len(secret))
+    return PATTERN_PHY_ID.sub(
+        lambda match: match.group(1) + _pseudonym(match.group(2)), data
+    )
+
+
+def redact_events(
+    events: list[TranscriptEvent],
+    secrets: Iterable[str] = (),
+    identifiers: Iterable[str] = (),
+) -> list[TranscriptEvent]:
+    """
+    Redact a recorded session before it is written.
+
+    Reads are scrubbed as one stream, so a banner, hostname or serial split
+    across chunks is still caught, then cut back at the original chunk
+    boundaries. Writes only have credentials replaced.
+    """
+    secret_list = [secret for secret in secrets if secret]
+    stream = scrub_stream(
+        b"".join(event.data for event in events if event.op == "r"),
+        [*secret_list, *identifiers],
+    )
+
+    redacted: list[TranscriptEvent] = []
+    position = 0
+    for event in events:
+        if event.op == "r":
+            data = stream[position:position + len(event.data)]
+            position += len(event.data)
+        else:
+            data = event.data
+            for secret in secret_list:
+                data = data.replace(secret.encode(), REDACTED)
+        redacted.append(TranscriptEvent(event.offset, event.op, data))
+    return redacted
+
+
+def write_transcript(
+    path: Path,
+    events: Iterable[TranscriptEvent],
+    header: dict[str, Any] | None = None,
+) -> None:
+    """Write events to a compressed transcript file."""
+    meta = {
+        "version": TRANSCRIPT_VERSION,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        **(header or {}),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.write(json.dumps(meta) + "\n")
+        for event in events:
+            handle.write(
+                json.dumps(
+                    {
+                        "t": round(event.offset, 6),
+                        "op": event.op,
+                        "data": event.data.decode("latin-1"),
+                    }
+                )
+                + "\n"
+            )
+
+
+def read_transcript(path: Path) -> tuple[dict[str, Any], list[TranscriptEvent]]:
+    """Read a compressed transcript file."""
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        header = json.loads(handle.readline())
+        if header.get("version") != TRANSCRIPT_VERSION:
+            raise ValueError(f"Unsupported transcript version: {header.get('version')}")
+        events = [
+            TranscriptEvent(
+                offset=float(record["t"]),
+                op=record["op"],
+                data=record["data"].encode("latin-1"),
+            )
+            for record in map(json.loads, handle)
+        ]
+    return header, events
+
+
+class RecordingTransport:
+    """Transport proxy that records every read and write of the inner transport."""
+
+    def __init__(
+        self,
+        inner: AsyncTransport,
+        path: Path,
+        secrets: Iterable[str] = (),
+        header: dict[str, Any] | None = None,
+        identifiers: Iterable[str] = (),
+    ) -> None:
+        self._inner = inner
+        self._base_transport_args = inner._base_transport_args
+        self.path = path
+        self.header = header or {}
+        self.events: list[TranscriptEvent] = []
+        self._secrets = list(secrets)
+        self._identifiers = list(identifiers)
+        self._opened_at = monotonic()
+
+    def _record(self, op: str, data: bytes) -> None:
+        self.events.append(TranscriptEvent(monotonic() - self._opened_at, op, data))
+
+    async def open(self) -> None:
+        self._opened_at = monotonic()
+        await self._inner.open()
+
+    def close(self) -> None:
+        self._inner.close()
+        write_transcript(
+            self.path,
+            redact_events(self.events, self._secrets, self._identifiers),
+            self.header,
+        )
+
+    def isalive(self) -> bool:
+        return self._inner.isalive()
+
+    async def read(self) -> bytes:
+        data = await self._inner.read()
+        self._record("r", data)
+        return data
+
+    def write(self, channel_input: bytes) -> None:
+        self._record("w", channel_input)
+        self._inner.write(channel_input)
+
+
+class TranscriptMismatch(ScrapliConnectionError):
+    """The client wrote something other than what the transcript recorded."""
+
+
+def _write_pattern(recorded: bytes) -> re.Pattern[bytes]:
+    # Redacted credentials match whatever the replaying client sends.
+    return re.compile(b".*?".join(re.escape(part) for part in recorded.split(REDACTED)), re.DOTALL)
+
+
+class ReplayTransport:
+    """
+    Transport that plays back a recorded transcript.
+
+    Every write is recorded in `writes` and checked against the next write
+    of the transcript (a redacted credential matches anything), so a client
+    sending a different command fails instead of replaying successfully. A
+    recorded read that followed one or more writes is only delivered after
+    the client has written again, so the Scrapli channel sees output in the
+    same order as the live session.
+    """
+
+    def __init__(
+        self,
+        events: list[TranscriptEvent],
+        base_transport_args: Any = None,
+        paced: bool = False,
+    ) -> None:
+        self._base_transport_args = base_transport_args
+        self.paced = paced
+        self._reads: list[tuple[float, bool, bytes]] = []
+        self._index = 0
+        self._expected = [event.data for event in events if event.op == "w"]
+        self.writes: list[bytes] = []
+        self._written = asyncio.Event()
+        self._open = False
+        self.bytes_read = 0
+
+        previous_offset = 0.0
+        saw_write = False
+        for event in events:
+            if event.op == "w":
+                saw_write = True
+            else:
+                self._reads.append((event.offset - previous_offset, saw_write, event.data))
+                saw_write = False
+            previous_offset = event.offset
+
+    async def open(self) -> None:
+        self._open = True
+
+    def close(self) -> None:
+        self._open = False
+
+    def isalive(self) -> bool:
+        return self._open and self._index < len(self._reads)
+
+    async def read(self) -> bytes:
+        if self._index >= len(self._reads):
+            raise ScrapliConnectionError("Transcript exhausted")
+
+        delay, needs_write, data = self._reads[self._index]
+        if needs_write:
+            await self._written.wait()
+        if self.paced and delay > 0:
+            await asyncio.sleep(delay)
+
+        # Only consume the chunk once nothing can cancel this read anymore.
+        if needs_write:
+            self._written.clear()
+        self._index += 1
+        self.bytes_read += len(data)
+        return data
+
+    def write(self, channel_input: bytes) -> None:
+        position = len(self.writes)
+        self.writes.append(channel_input)
+        if position >= len(self._expected):
+            raise TranscriptMismatch(f"Unexpected write {channel_input!r}: transcript has no more")
+        expected = self._expected[position]
+        if not _write_pattern(expected).fullmatch(channel_input):
+            raise TranscriptMismatch(
+                f"Unexpected write {channel_input!r}: transcript has {expected!r}"
+            )
+        self._written.set()
+
+
+def recording_wrapper(
+    path: Path,
+    secrets: Iterable[str] = (),
+    header: dict[str, Any] | None = None,
+    identifiers: Iterable[str] = (),
+) -> TransportWrapper:
+    """Return a FiberhomeClient transport wrapper that records to path."""
+    secret_list = list(secrets)
+    identifier_list = list(identifiers)
+
+    def wrap(inner: AsyncTransport) -> RecordingTransport:
+        return RecordingTransport(inner, path, secret_list, header, identifier_list)
+
+    return wrap
+
+
+def replay_wrapper(path: Path, paced: bool = False) -> TransportWrapper:
+    """Return a FiberhomeClient transport wrapper that replays path."""
+    _, events = read_transcript(path)
+
+    def wrap(inner: AsyncTransport) -> ReplayTransport:
+        return ReplayTransport(events, inner._base_transport_args, paced=paced)
+
+    return wrap
@@ -0,0 +1,247 @@
+"""
+Zabbix sender (trapper) protocol client.
+
+Pushes per-item values straight to Zabbix trapper items, batching many
+values into a few large requests. Values that could not be delivered are
+kept in a bounded on-disk retry buffer and resent on the next push. The
+buffer is shared by every process pushing to the same server, so it is
+only updated under a file lock, by merging with what is on disk.
+
+Wire format:
+    b"ZBXD\\x01" + <8-byte little-endian payload length> + <JSON payload>
+"""
+
+import fcntl
+import json
+import logging
+import re
+import socket
+import struct
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+try:
+    from .state import load_state, olt_state_dir, save_state
+except ImportError:
+    from state import load_state, olt_state_dir, save_state
+
+logger = logging.getLogger(__name__)
+
+ZBX_HEADER = b"ZBXD\x01"
+ZBX_HEADER_SIZE = len(ZBX_HEADER) + 8
+SENDER_PORT = 10051
+SENDER_TIMEOUT = 10
+SENDER_BATCH_SIZE = 1000
+SENDER_BUFFER_MAX = 100000
+SENDER_BUFFER_STATE = "sender_buffer"
+
+_INFO_PATTERN = re.compile(r"processed: (\d+); failed: (\d+); total: (\d+)")
+
+
+@dataclass(frozen=True)
+class SenderValue:
+    """One value for a Zabbix trapper item."""
+    host: str
+    key: str
+    value: str
+    clock: int
+
+
+@dataclass(frozen=True)
+class SenderResult:
+    """Outcome of a push."""
+    processed: int = 0
+    failed: int = 0
+    buffered: int = 0
+
+
+def encode_request(values: list[SenderValue]) -> bytes:
+    """Encode a 'sender data' request."""
+    payload = json.dumps(
+        {
+            "request": "sender data",
+            "data": [
+                {"host": v.host, "key": v.key, "value": v.value, "clock": v.clock}
+                for v in values
+            ],
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return ZBX_HEADER + struct.pack("<Q", len(payload)) + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks: list[bytes] = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Connection closed by Zabbix trapper")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_message(sock: socket.socket) -> dict[str, Any]:
+    """Read one ZBXD-framed JSON message from a socket."""
+    header = _recv_exact(sock, ZBX_HEADER_SIZE)
+    if not header.startswith(ZBX_HEADER):
+        raise ValueError("Invalid Zabbix protocol header")
+    (length,) = struct.unpack("<Q", header[len(ZBX_HEADER):])
+    return json.loads(_recv_exact(sock, length))
+
+
+class ZabbixSender:
+    """Batched Zabbix sender with an on-disk retry buffer."""
+
+    def __init__(
+        self,
+        server: str,
+        port: int = SENDER_PORT,
+        timeout: float = SENDER_TIMEOUT,
+        batch_size: int = SENDER_BATCH_SIZE,
+        buffer_max: int = SENDER_BUFFER_MAX,
+    ) -> None:
+        self.server = server
+        self.port = port
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.buffer_max = buffer_max
+        self._buffer_key = f"{server}_{port}"
+
+    def _send_batch(self, values: list[SenderValue]) -> tuple[int, int]:
+        with socket.create_connection((self.server, self.port), timeout=self.timeout) as sock:
+            sock.sendall(encode_request(values))
+            response = read_message(sock)
+
+        if response.get("response") != "success":
+            raise ConnectionError(f"Zabbix trapper rejected batch: {response}")
+        match = _INFO_PATTERN.search(response.get("info", ""))
+        if not match:
+            return len(values), 0
+        return int(match.group(1)), int(match.group(2))
+
+    @contextmanager
+    def _buffer_lock(self) -> Iterator[None]:
+        directory = olt_state_dir(self._buffer_key)
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / f"{SENDER_BUFFER_STATE}.lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+
+    def _load_buffer(self) -> list[SenderValue]:
+        stored = load_state(self._buffer_key, SENDER_BUFFER_STATE).get("values", [])
+        return [SenderValue(*item) for item in stored]
+
+    def _save_buffer(self, values: list[SenderValue]) -> None:
+        if len(values) > self.buffer_max:
+            logger.warning(
+                "Sender buffer full, dropping %s oldest values", len(values) - self.buffer_max
+            )
+            values = values[-self.buffer_max:]
+        save_state(
+            self._buffer_key,
+            SENDER_BUFFER_STATE,
+            {"values": [[v.host, v.key, v.value, v.clock] for v in values]},
+        )
+
+    def _update_buffer(
+        self, delivered: list[SenderValue], undelivered: list[SenderValue]
+    ) -> None:
+        # Another process may have buffered values since this push read the
+        # buffer, so merge with the file instead of overwriting it.
+        with self._buffer_lock():
+            sent = set(delivered)
+            kept = [v for v in self._load_buffer() if v not in sent]
+            known = set(kept)
+            kept.extend(v for v in undelivered if v not in known)
+            self._save_buffer(kept)
+
+    def send(self, values: list[SenderValue]) -> SenderResult:
+        """Send buffered and new values; keep whatever could not be delivered."""
+        with self._buffer_lock():
+            buffered = self._load_buffer()
+        pending = buffered + list(values)
+        processed = 0
+        failed = 0
+
+        for offset in range(0, len(pending), self.batch_size):
+            batch = pending[offset:offset + self.batch_size]
+            try:
+                batch_processed, batch_failed = self._send_batch(batch)
+            except (OSError, ValueError) as exc:
+                logger.error(
+                    "Failed to push to Zabbix server=%s port=%s: %s", self.server, self.port, exc
+                )
+                remaining = pending[offset:]
+                self._update_buffer(pending[:offset], remaining)
+                return SenderResult(processed, failed, len(remaining))
+            processed += batch_processed
+            failed += batch_failed
+
+        if buffered:
+            self._update_buffer(buffered, [])
+        logger.info(
+            "Pushed to Zabbix server=%s processed=%s failed=%s", self.server, processed, failed
+        )
+        return SenderResult(processed, failed, 0)
+
+
+def sender_from_spec(spec: str) -> ZabbixSender:
+    """Build a sender from a "server[:port]" value."""
+    server, _, port = spec.partition(":")
+    return ZabbixSender(server, int(port or SENDER_PORT))
+
+
+def _clock(metadata: dict[str, Any]) -> int:
+    return int(datetime.fromisoformat(metadata["timestamp"]).timestamp())
+
+
+def response_values(host: str, response: dict[str, Any]) -> list[SenderValue]:
+    """
+    Convert a status or signals collector response into trapper values.
+
+    Keys match the item keys of the dependent-item template so triggers and
+    graphs carry over. Signal and optics entries not refreshed in this run
+    (served from the sweep cache) are skipped because they were already
+    pushed when collected.
+    """
+    data = response["data"]
+    metadata = data["metadata"]
+    clock = _clock(metadata)
+    values: list[SenderValue] = []
+
+    def add(key: str, value: Any) -> None:
+        values.append(SenderValue(host, key, str(value), clock))
+
+    if "pon_ports" in data:
+        for port in data["pon_ports"]:
+            add(f"OntOnline.[{port['pon_name']}]", port["online"])
+            add(f"OntOffline.[{port['pon_name']}]", port["offline"])
+            add(f"OntProvisioned.[{port['pon_name']}]", port["provisioned"])
+        if metadata["success"]:
+            add("TotalOntOnline", data["totals"]["online"])
+            add("TotalOntOffline", data["totals"]["offline"])
+            add("TotalOntProvisioned", data["totals"]["provisioned"])
+
+    for entry in data.get("pon_signals", []):
+        if not entry.get("refreshed"):
+            continue
+        add(f"OntBestSinal.[{entry['pon_name']}]", entry["best_signal"])
+        add(f"OntMediaSinal.[{entry['pon_name']}]", entry["median_signal"])
+        add(f"OntPoorSinal.[{entry['pon_name']}]", entry["poor_signal"])
+
+    for entry in data.get("pon_optics", []):
+        if not entry.get("refreshed"):
+            continue
+        if entry["temperature"] is not None:
+            add(f"PonOpticTemperature.[{entry['pon_name']}]", entry["temperature"])
+        if entry["tx_power"] is not None:
+            add(f"PonOpticTxPower.[{entry['pon_name']}]", entry["tx_power"])
+
+    mode = "status" if "pon_ports" in data else "signals"
+    add(f"fiberhome.{mode}.success", int(metadata["success"]))
+    add(f"fiberhome.{mode}.duration_ms", metadata["collection_time_ms"])
+    return values
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+fiberhome_olt_exporter.py — Prometheus exporter for cached OLT results.
+
+Serves per-PON status and signal metrics (olt/slot/pon labels) from the
+last cached collection of every OLT. Collections keep running on their own
+schedule (Zabbix external checks or fiberhome_olt_fleet.py); scrapes never
+log into an OLT, so scrape interval and scraper count add no OLT load.
+Collection success, duration, timestamp and age are exported per OLT.
+
+Usage:
+  fiberhome_olt_exporter.py [--bind 0.0.0.0] [--port 9650]
+
+Endpoints:
+  GET /metrics    Prometheus text exposition format
+"""
+
+import argparse
+import logging
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from fiberhome.bootstrap import reexec_with_venv
+
+reexec_with_venv(Path(__file__).resolve().parent)
+
+from fiberhome.metrics import CONTENT_TYPE, MetricsCache
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+logger = logging.getLogger(__name__)
+
+EXPORTER_PORT = 9650
+
+
+def make_handler(cache: MetricsCache) -> type[BaseHTTPRequestHandler]:
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            payload = cache.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return MetricsHandler
+
+
+def make_server(bind: str = "0.0.0.0", port: int = EXPORTER_PORT) -> ThreadingHTTPServer:
+    """Build the exporter HTTP server."""
+    return ThreadingHTTPServer((bind, port), make_handler(MetricsCache()))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prometheus exporter for Fiberhome OLTs")
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=EXPORTER_PORT)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for the exporter."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    server = make_server(args.bind, args.port)
+    logger.info("Exporter listening on %s:%s", args.bind, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+fiberhome_olt_fleet.py — Sharded fleet collector for many OLTs.
+
+Shards the OLT inventory across a pool of worker processes. Each OLT is
+assigned to a worker by a stable hash of its IP, so it always lands on the
+same process. Every worker runs its own event loop of FiberhomeClient
+collections and returns already-serialized JSON, so raw CLI text never
+crosses the process boundary.
+
+Each worker keeps one event loop and a pool of open sessions for the
+life of the process, so with --interval an OLT is logged into once and
+its session is reused on every cycle. A session goes back to the pool
+only when the collection left it at the prompt; a failed command or a
+session the OLT closed while idle means a fresh login. Replayed
+transcript entries always open their own session. Cycle time scales with
+--workers only while collections are CPU-bound and the host has spare
+cores.
+
+Usage:
+  fiberhome_olt_fleet.py <inventory.json> [--mode status|signals]
+                         [--workers N] [--concurrency N] [--interval SECONDS]
+                         [--cycles N] [--zabbix-server HOST[:PORT]] [--batch olt|fleet]
+
+Inventory format:
+  [{"name": "olt-01", "ip": "10.0.0.1", "user": "GEPON",
+    "password": "GEPON", "port": 23, "host": "OLT-01"}]
+
+--cycles N stops after N cycles (with or without --interval), which is
+handy for benchmarks.
+
+With --zabbix-server, results are also pushed to trapper items of the
+Zabbix host named by "host" (default: "name"), one request per OLT or a
+few large requests for the whole fleet.
+
+An entry with a "transcript" path (and optional "paced": true) is
+replayed instead of contacted, which turns the inventory into a fake-OLT
+benchmark for measuring scaling with --workers.
+
+"port" also accepts "ssh:22" or "ssh+zlib:22" to collect over SSH
+(optionally compressed) instead of Telnet.
+
+Output: one JSON line per OLT on stdout.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import zlib
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Any
+
+from fiberhome.bootstrap import reexec_with_venv
+
+reexec_with_venv(Path(__file__).resolve().parent)
+
+from fiberhome.constants import TELNET_TIMEOUT
+from fiberhome.scrapli_client import FiberhomeClient
+from fiberhome.transcript import replay_wrapper
+from fiberhome.zabbix_sender import ZabbixSender, response_values, sender_from_spec
+from fiberhome_olt_signals import collect_olt_signals
+from fiberhome_olt_status import collect_olt_status
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+logger = logging.getLogger(__name__)
+
+COLLECTORS = {
+    "status": collect_olt_status,
+    "signals": collect_olt_signals,
+}
+DEFAULT_CONCURRENCY = 16
+
+
+def load_inventory(path: Path) -> list[dict[str, Any]]:
+    """Load the OLT inventory JSON file."""
+    inventory = json.loads(path.read_text(encoding="utf-8"))
+    for olt in inventory:
+        olt.setdefault("name", olt["ip"])
+        olt.setdefault("port", 23)
+    return inventory
+
+
+def shard_for(ip: str, workers: int) -> int:
+    """Return the stable worker index for an OLT."""
+    return zlib.crc32(ip.encode("utf-8")) % workers
+
+
+def shard_inventory(
+    inventory: list[dict[str, Any]],
+    workers: int,
+) -> list[list[dict[str, Any]]]:
+    """Split the inventory into per-worker shards by stable hash."""
+    shards: list[list[dict[str, Any]]] = [[] for _ in range(workers)]
+    for olt in inventory:
+        shards[shard_for(olt["ip"], workers)].append(olt)
+    return shards
+
+
+class SessionPool:
+    """Open OLT sessions kept by one worker process across cycles."""
+
+    def __init__(self, client_class: Callable[..., FiberhomeClient] = FiberhomeClient) -> None:
+        self.client_class = client_class
+        self._idle: dict[tuple[Any, ...], list[FiberhomeClient]] = {}
+
+    @staticmethod
+    def _key(client: FiberhomeClient) -> tuple[Any, ...]:
+        return (client.host, client.port, client.transport, client.username, client.dialect.name)
+
+    def factory(self, *args: Any, **kwargs: Any) -> "_PooledSession":
+        """Client factory for the collectors, drawing on the pool."""
+        return _PooledSession(self, self.client_class(*args, **kwargs))
+
+    async def checkout(self, client: FiberhomeClient) -> FiberhomeClient:
+        """Return an idle live session like `client`, or log `client` in."""
+        idle = self._idle.get(self._key(client), [])
+        while idle:
+            pooled = idle.pop()
+            if await pooled.is_alive():
+                return pooled
+            await _disconnect(pooled)
+        await client.connect()
+        return client
+
+    async def checkin(self, client: FiberhomeClient) -> None:
+        """Keep a session for the next cycle, or close it."""
+        # A login capped by a collection deadline also has short command
+        # timeouts, so such sessions are not kept.
+        if client.reusable and client.timeout >= TELNET_TIMEOUT:
+            self._idle.setdefault(self._key(client), []).append(client)
+        else:
+            await _disconnect(client)
+
+    async def close(self) -> None:
+        """Close every idle session."""
+        idle, self._idle = self._idle, {}
+        for clients in idle.values():
+            for client in clients:
+                await _disconnect(client)
+
+
+class _PooledSession:
+    def __init__(self, pool: SessionPool, client: FiberhomeClient) -> None:
+        self.pool = pool
+        self.client = client
+
+    async def __aenter__(self) -> FiberhomeClient:
+        self.client = await self.pool.checkout(self.client)
+        return self.client
+
+    async def __aexit__(self, exc_type: object, exc_val: object, exc_tb: object) -> None:
+        if exc_type is None:
+            await self.pool.checkin(self.client)
+        else:
+            await _disconnect(self.client)
+
+
+async def _disconnect(client: FiberhomeClient) -> None:
+    try:
+        await client.disconnect()
+    except Exception as exc:
+        logger.debug("Ignoring session close error: %s", exc)
+
+
+async def _collect_shard(
+    shard: list[dict[str, Any]],
+    mode: str,
+    concurrency: int,
+    pool: SessionPool,
+) -> list[str]:
+    collector = COLLECTORS[mode]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def collect_one(olt: dict[str, Any]) -> str:
+        args = (olt["ip"], olt["user"], olt["password"], olt["port"])
+        async with semaphore:
+            if olt.get("transcript"):
+                wrapper = replay_wrapper(Path(olt["transcript"]), paced=olt.get("paced", False))
+                factory = partial(FiberhomeClient, transport_wrapper=wrapper)
+                result = await collector(*args, client_factory=factory)
+            else:
+                result = await collector(*args, client_factory=pool.factory)
+        result["data"]["metadata"]["olt_name"] = olt["name"]
+        return json.dumps(result, separators=(",", ":"))
+
+    return list(await asyncio.gather(*(collect_one(olt) for olt in shard)))
+
+
+# Event loop and session pool of this worker process, kept across cycles.
+_loop: asyncio.AbstractEventLoop | None = None
+_pool: SessionPool | None = None
+
+
+def run_shard(
+    shard: list[dict[str, Any]],
+    mode: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[str]:
+    """Worker entry point: collect one shard and return serialized results."""
+    global _loop, _pool
+    if not shard:
+        return []
+    if _loop is None or _pool is None:
+        _loop = asyncio.new_event_loop()
+        _pool = SessionPool()
+    return _loop.run_until_complete(_collect_shard(shard, mode, concurrency, _pool))
+
+
+def close_shard() -> None:
+    """Worker exit: log out of pooled sessions and close the event loop."""
+    global _loop, _pool
+    if _loop is None:
+        return
+    if _pool is not None:
+        _loop.run_until_complete(_pool.close())
+    _loop.close()
+    _loop = _pool = None
+
+
+class FleetRunner:
+    """Runs collections for a sharded inventory on pinned worker processes."""
+
+    def __init__(
+        self,
+        inventory: list[dict[str, Any]],
+        mode: str = "status",
+        workers: int | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.shards = shard_inventory(inventory, self.workers)
+        # One single-process executor per shard pins each OLT to the same
+        # worker process across cycles.
+        self._executors = [ProcessPoolExecutor(max_workers=1) for _ in self.shards]
+
+    def __enter__(self) -> "FleetRunner":
+        return self
+
+    def __exit__(self, exc_type: object, exc_val: object, exc_tb: object) -> None:
+        self.close()
+
+    def run_once(self) -> list[str]:
+        """Collect every OLT once and return the serialized results."""
+        started_at = perf_counter()
+        futures = [
+            executor.submit(run_shard, shard, self.mode, self.concurrency)
+            for executor, shard in zip(self._executors, self.shards)
+        ]
+        results: list[str] = []
+        for future in futures:
+            results.extend(future.result())
+        logger.info(
+            "Fleet cycle complete mode=%s olts=%s workers=%s duration_ms=%s",
+            self.mode,
+            len(results),
+            self.workers,
+            round((perf_counter() - started_at) * 1000),
+        )
+        return results
+
+    def close(self) -> None:
+        for future in [executor.submit(close_shard) for executor in self._executors]:
+            try:
+                future.result()
+            except Exception as exc:
+                logger.warning("Failed to close shard sessions: %s", exc)
+        for executor in self._executors:
+            executor.shutdown()
+
+
+def push_results(
+    sender: ZabbixSender,
+    lines: list[str],
+    hosts: dict[str, str],
+    batch: str = "fleet",
+) -> None:
+    """Push serialized collector results to Zabbix trapper items."""
+    values = []
+    for line in lines:
+        response = json.loads(line)
+        olt_values = response_values(hosts[response["data"]["metadata"]["olt_name"]], response)
+        if batch == "olt":
+            sender.send(olt_values)
+        else:
+            values.extend(olt_values)
+    if values:
+        sender.send(values)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sharded Fiberhome fleet collector")
+    parser.add_argument("inventory", type=Path)
+    parser.add_argument("--mode", choices=sorted(COLLECTORS), default="status")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--interval", type=float, default=None)
+    parser.add_argument("--cycles", type=int, default=None)
+    parser.add_argument("--zabbix-server", default=None)
+    parser.add_argument("--batch", choices=["olt", "fleet"], default="fleet")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for the fleet collector."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    inventory = load_inventory(args.inventory)
+
+    sender = sender_from_spec(args.zabbix_server) if args.zabbix_server else None
+    hosts = {olt["name"]: olt.get("host", olt["name"]) for olt in inventory}
+
+    with FleetRunner(inventory, args.mode, args.workers, args.concurrency) as runner:
+        cycles = 0
+        while True:
+            cycle_started = perf_counter()
+            lines = runner.run_once()
+            for line in lines:
+                print(line, flush=True)
+            if sender is not None:
+                push_results(sender, lines, hosts, args.batch)
+            cycles += 1
+            if args.cycles is not None and cycles >= args.cycles:
+                break
+            if args.interval is None:
+                if args.cycles is None:
+                    break
+                continue
+            sleep(max(0.0, args.interval - (perf_counter() - cycle_started)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ Descoberta LLD de portas PON via SNMP para o Zabbix.
 
 Uso (chamado pelo Zabbix como External Script):
   python3 GetPONName.py <ip> <community> <hostname> <user> <password> <port> [snmp_port]
+                        [modo] [carencia_horas]
 
 Sintaxe SNMP confirmada (porta customizada via IP:porta):
   snmpwalk -v 1 -c <community> <IP>:<snmp_port> <OID>
@@ -16,6 +17,19 @@ Saída SNMP confirmada:
 Saída: JSON no formato Zabbix LLD
   {"data": [{"{#PONNAME}": "1/1", "{#PONSLOT}": "1", "{#PONPORT}": "1"}]}
 
+Também guarda a lista de slots com PONs, usada pela coleta de status
+particionada por slot.
+
+Modos (parâmetro opcional, padrão "all"):
+  all       todas as PONs da tabela SNMP (comportamento original)
+  annotate  todas as PONs, com {#PONOCCUPIED} = "1" ou "0"
+  occupied  só PONs com ONUs autorizadas
+
+A ocupação vem da tabela de autorização em cache (gravada pela coleta de
+status). Uma PON que esvaziou continua ocupada durante a carência (padrão
+24h) para os itens não serem apagados de imediato. Sem cache, ou com cache
+mais velho que a carência, todas as PONs são retornadas.
+
 Nota: A partir da v2.0, este script NÃO configura mais cron.
       O monitoramento usa Zabbix Dependent Items (pull model).
 """
@@ -23,6 +37,12 @@ Nota: A partir da v2.0, este script NÃO configura mais cron.
 import os
 import sys
 import json
+from time import time
+
+from fiberhome.constants import LLD_PRUNE_GRACE_HOURS
+from fiberhome.onu_index import occupied_pons, remember_slots
+from fiberhome.profiling import capture_profile
+from fiberhome.state import load_state, save_state
 
 
 # ---------------------------------------------------------------------------
@@ -31,6 +51,9 @@ import json
 OID_PON_PORT_NAME = "1.3.6.1.4.1.5875.800.3.9.3.4.1.2"
 OID_PON_PORT_DESCRIPTION = "1.3.6.1.4.1.5875.800.3.9.3.4.1.3"
 
+LLD_MODES = ("all", "annotate", "occupied")
+PON_OCCUPANCY_STATE = "pon_occupancy"
+
 
 def parse_pon_index(oid_suffix: str) -> tuple[int | None, int | None]:
     """
@@ -106,6 +129,57 @@ def get_pon_list(ip: str, community: str, snmp_port: int = 161) -> list[dict]:
     return list(pons.values())
 
 
+def pon_occupancy(
+    ip: str,
+    grace_hours: float = LLD_PRUNE_GRACE_HOURS,
+    now: float | None = None,
+) -> set[str] | None:
+    """
+    Retorna as PONs ("slot/pon") ocupadas segundo a autorização em cache.
+
+    Guarda o último instante em que cada PON teve ONUs; a PON segue ocupada
+    até a carência expirar. Retorna None sem cache utilizável.
+    """
+    now = time() if now is None else now
+    cutoff = now - grace_hours * 3600
+    occupied, collected_at = occupied_pons(ip)
+    if collected_at is None or collected_at < cutoff:
+        return None
+
+    last_seen: dict[str, float] = load_state(ip, PON_OCCUPANCY_STATE).get("last_seen", {})
+    # Cada PON usa o instante da coleta do seu slot: linhas de um slot que
+    # falhou são cópias de uma coleta anterior e não renovam a carência.
+    for (slot, pon), seen in occupied.items():
+        name = f"{slot}/{pon}"
+        last_seen[name] = max(last_seen.get(name, 0), seen)
+    last_seen = {name: seen for name, seen in last_seen.items() if seen >= cutoff}
+    save_state(ip, PON_OCCUPANCY_STATE, {"last_seen": last_seen})
+    return set(last_seen)
+
+
+def parse_grace_hours(argv: list[str]) -> float:
+    """Lê a carência (horas) do 9º argumento; ausente ou inválida usa o padrão."""
+    try:
+        return float(argv[9])
+    except (IndexError, ValueError):
+        # Ex.: macro {$PON_LLD_GRACE_HOURS} não resolvida no host
+        return LLD_PRUNE_GRACE_HOURS
+
+
+def filter_pons(pons: list[dict], occupancy: set[str] | None, mode: str) -> list[dict]:
+    """Filtra ou anota as PONs conforme o modo; sem ocupação, não poda nada."""
+    if mode == "all":
+        return pons
+
+    result = []
+    for p in pons:
+        occupied = occupancy is None or f"{p['slot']}/{p['pon']}" in occupancy
+        if mode == "occupied" and not occupied:
+            continue
+        result.append({**p, "occupied": occupied})
+    return result
+
+
 def main(
     ip: str,
     community: str,
@@ -113,7 +187,9 @@ def main(
     user: str,
     password: str,
     port: str,
-    snmp_port: int = 161
+    snmp_port: int = 161,
+    mode: str = "all",
+    grace_hours: float = LLD_PRUNE_GRACE_HOURS,
 ) -> None:
     """
     Executa LLD e retorna JSON para Zabbix.
@@ -122,15 +198,32 @@ def main(
     """
     pons = get_pon_list(ip, community, snmp_port)
 
+    # Guarda os slots com PONs para a coleta de status particionada por slot.
+    if pons:
+        try:
+            remember_slots(ip, {p["slot"] for p in pons})
+        except OSError:
+            pass
+
+    if mode != "all":
+        try:
+            occupancy = pon_occupancy(ip, grace_hours)
+        except OSError:
+            occupancy = None
+        pons = filter_pons(pons, occupancy, mode)
+
     export = {"data": []}
     for p in pons:
-        export["data"].append({
+        entry = {
             "{#PONNAME}": p["name"],
             "{#PONALIAS}": p["alias"],
             "{#PONSLOT}": p["slot"],
             "{#PONPORT}": p["pon"],
             "{#INDEX}": p["portIndex"]
-        })
+        }
+        if "occupied" in p:
+            entry["{#PONOCCUPIED}"] = "1" if p["occupied"] else "0"
+        export["data"].append(entry)
 
     print(json.dumps(export))
 
@@ -143,5 +236,8 @@ if __name__ == "__main__":
     password = sys.argv[5]
     port = sys.argv[6]
     snmp_port = int(sys.argv[7]) if len(sys.argv) > 7 else 161
+    mode = sys.argv[8] if len(sys.argv) > 8 and sys.argv[8] in LLD_MODES else "all"
+    grace_hours = parse_grace_hours(sys.argv)
 
-    main(ip, community, hostname, user, password, port, snmp_port)
+    with capture_profile("lld", ip):
+        main(ip, community, hostname, user, password, port, snmp_port, mode, grace_hours)
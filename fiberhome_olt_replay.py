@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+fiberhome_olt_replay.py — Record and replay OLT sessions for benchmarks.
+
+Records real (redacted) Telnet/SSH sessions as compressed transcripts and
+replays them through the full collect_olt_status / collect_olt_signals
+pipeline, either at full speed or at the recorded pace.
+
+The Telnet/SSH wire benchmark against a local stand-in OLT lives in
+bench/wire_bench.py and is not deployed.
+
+Usage:
+  fiberhome_olt_replay.py record <ip> <user> <password> [--port 23|ssh:22|ssh+zlib:22]
+                          [--mode status|signals] [--model AN5516-01]
+                          [--redact TEXT ...] --out FILE
+  fiberhome_olt_replay.py bench <transcript> [--mode status|signals]
+                          [--iterations N] [--paced]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from fiberhome.bootstrap import reexec_with_venv
+
+reexec_with_venv(Path(__file__).resolve().parent)
+
+from fiberhome.scrapli_client import FiberhomeClient, parse_port_spec
+from fiberhome.transcript import read_transcript, recording_wrapper, replay_wrapper
+from fiberhome_olt_signals import collect_olt_signals
+from fiberhome_olt_status import collect_olt_status
+
+COLLECTORS = {
+    "status": collect_olt_status,
+    "signals": collect_olt_signals,
+}
+
+
+async def record_session(args: argparse.Namespace) -> dict[str, Any]:
+    """Run one live collection while recording the transport."""
+    header = {"host": args.name or "olt", "model": args.model, "mode": args.mode}
+    wrapper = recording_wrapper(
+        args.out,
+        secrets=[args.user, args.password],
+        header=header,
+        identifiers=[args.ip, *args.redact],
+    )
+    factory = partial(FiberhomeClient, transport_wrapper=wrapper)
+    return await COLLECTORS[args.mode](
+        args.ip, args.user, args.password, args.port, client_factory=factory
+    )
+
+
+async def bench_transcript(args: argparse.Namespace) -> dict[str, Any]:
+    """Replay a transcript through the collector and report timings."""
+    header, _ = read_transcript(args.transcript)
+    mode = args.mode or header.get("mode", "status")
+    wrapper = replay_wrapper(args.transcript, paced=args.paced)
+    factory = partial(FiberhomeClient, transport_wrapper=wrapper)
+
+    durations: list[float] = []
+    result: dict[str, Any] = {}
+    for _ in range(args.iterations):
+        started_at = perf_counter()
+        result = await COLLECTORS[mode](
+            header.get("host", "replay"), "replay", "replay", client_factory=factory
+        )
+        json.dumps(result)
+        durations.append((perf_counter() - started_at) * 1000)
+
+    return {
+        "transcript": str(args.transcript),
+        "model": header.get("model"),
+        "mode": mode,
+        "paced": args.paced,
+        "iterations": args.iterations,
+        "success": result["data"]["metadata"]["success"],
+        "min_ms": round(min(durations), 2),
+        "median_ms": round(statistics.median(durations), 2),
+        "max_ms": round(max(durations), 2),
+    }
+
+
+def port_spec(value: str) -> str:
+    """argparse type for a FiberhomeClient port spec (23, ssh:22, ssh+zlib:22)."""
+    try:
+        parse_port_spec(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    return value
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record and replay Fiberhome OLT sessions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record")
+    record.add_argument("ip")
+    record.add_argument("user")
+    record.add_argument("password")
+    record.add_argument("--port", type=port_spec, default="23")
+    record.add_argument("--mode", choices=sorted(COLLECTORS), default="status")
+    record.add_argument("--model", default=None)
+    record.add_argument("--name", default=None)
+    record.add_argument("--redact", action="append", default=[], help="extra text to mask")
+    record.add_argument("--out", type=Path, required=True)
+
+    bench = commands.add_parser("bench")
+    bench.add_argument("transcript", type=Path)
+    bench.add_argument("--mode", choices=sorted(COLLECTORS), default=None)
+    bench.add_argument("--iterations", type=int, default=10)
+    bench.add_argument("--paced", action="store_true")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for transcript recording and replay benchmarks."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command == "record":
+        result = asyncio.run(record_session(args))
+        print(json.dumps(result["data"]["metadata"], indent=2))
+        return 0 if result["data"]["metadata"]["success"] else 1
+
+    report = asyncio.run(bench_transcript(args))
+    print(json.dumps(report, indent=2))
+    return 0 if report["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
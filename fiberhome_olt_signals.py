@@ -2,25 +2,59 @@
 """
 fiberhome_olt_signals.py — Master Item for Zabbix Dependent Items.
 
-Collects optical signal metrics (best/worst/median dBm) per PON
+Collects optical signal metrics (best/worst/median dBm) and PON
+transceiver parameters (temperature, voltage, bias, TX power) per PON
 and returns JSON for Zabbix to parse via JSONPath preprocessing.
+
+PONs are swept within a deadline, resuming from a persisted round-robin
+cursor, and fresh results are merged with cached ones. PONs refreshed in
+this run are flagged "refreshed" with age 0; cached ones carry their age.
+A worst-N ONU report joins per-ONU RECV_POWER with the authorization table.
+
+With a Zabbix server argument the result is also pushed to trapper items
+of the given host (default: the OLT IP), as fiberhome_olt_fleet.py does.
 """
 
 import asyncio
+import heapq
 import json
 import logging
 import sys
+from collections.abc import Callable
+from contextlib import AsyncExitStack
 from datetime import datetime, timezone
 from pathlib import Path
-from time import perf_counter
+from time import perf_counter, time
 from typing import Any
 
 from fiberhome.bootstrap import reexec_with_venv
 
 reexec_with_venv(Path(__file__).resolve().parent)
 
-from fiberhome.parsers import extract_pon_pairs, parse_pon_signals
+from fiberhome.constants import (
+    CMD_TIMEOUT_SIGNAL,
+    CMD_WAIT_SIGNAL,
+    SIGNALS_DEADLINE,
+    SIGNALS_EXIT_RESERVE,
+    SIGNALS_RELOGIN_MIN,
+    TELNET_TIMEOUT,
+    WORST_ONU_COUNT,
+    WORST_ONU_PER_PON,
+    ONURecord,
+)
+from fiberhome.dialects import DEFAULT_DIALECT, Dialect
+from fiberhome.metrics import save_last_response
+from fiberhome.onu_index import save_onu_records, save_onu_signals
+from fiberhome.parsers import (
+    extract_pon_pairs,
+    parse_onu_records,
+    parse_onu_signals,
+    parse_pon_optics,
+)
+from fiberhome.profiling import capture_profile
 from fiberhome.scrapli_client import FiberhomeClient
+from fiberhome.state import load_state, save_state
+from fiberhome.zabbix_sender import response_values, sender_from_spec
 
 if not logging.getLogger().handlers:
     logging.basicConfig(
@@ -31,78 +65,344 @@ if not logging.getLogger().handlers:
 logger = logging.getLogger(__name__)
 
 
+SWEEP_STATE = "signals_sweep"
+
+
 def build_response(
     pon_signals: list,
     collection_time_ms: float,
     olt_ip: str,
     success: bool = True,
     error: str | None = None,
+    pon_optics: list | None = None,
+    sweep: dict[str, Any] | None = None,
+    worst_onus: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     """Build JSON response structure."""
     return {
         "data": {
             "pon_signals": pon_signals,
+            "pon_optics": pon_optics or [],
+            "worst_onus": worst_onus or {"global": [], "per_pon": {}},
             "metadata": {
                 "timestamp": datetime.now(timezone.utc).isoformat(),
                 "collection_time_ms": round(collection_time_ms),
                 "olt_ip": olt_ip,
                 "success": success,
                 "error": error,
+                **(sweep or {}),
             },
         }
     }
 
 
+def sweep_order(
+    pon_pairs: set[tuple[str, str]],
+    cursor: list[str] | None,
+) -> list[tuple[str, str]]:
+    """Return PONs in round-robin order, starting right after the cursor."""
+    ordered = sorted(pon_pairs)
+    if not cursor:
+        return ordered
+    last = tuple(cursor)
+    split = next((i for i, pair in enumerate(ordered) if pair > last), 0)
+    return ordered[split:] + ordered[:split]
+
+
+def collect_pon_entry(
+    output: str,
+    slot: str,
+    pon: str,
+    dialect: Dialect = DEFAULT_DIALECT,
+    readings: list[tuple[str, float]] | None = None,
+) -> dict[str, Any]:
+    """Parse one PON's optic_module_para output into a cacheable entry."""
+    if readings is None:
+        readings = parse_onu_signals(output)
+    entry: dict[str, Any] = {
+        "collected_at": time(),
+        "signals": None,
+        "optics": None,
+        # Bounded heap selection: only the worst candidates are cached.
+        "worst": heapq.nsmallest(WORST_ONU_COUNT, readings, key=lambda reading: reading[1]),
+    }
+
+    signals = dialect.parse_signals(output, slot, pon)
+    if signals:
+        entry["signals"] = {
+            "slot": signals.slot,
+            "pon": signals.pon,
+            "pon_name": signals.pon_name,
+            "best_signal": signals.best_signal,
+            "poor_signal": signals.poor_signal,
+            "median_signal": signals.median_signal,
+            "onu_count": signals.onu_count,
+        }
+
+    optics = parse_pon_optics(output, slot, pon)
+    if optics:
+        entry["optics"] = {
+            "slot": optics.slot,
+            "pon": optics.pon,
+            "pon_name": optics.pon_name,
+            "type_km": optics.type_km,
+            "temperature": optics.temperature,
+            "voltage": optics.voltage,
+            "bias_current": optics.bias_current,
+            "tx_power": optics.tx_power,
+        }
+
+    return entry
+
+
+def entry_age(
+    pon_name: str,
+    entry: dict[str, Any],
+    refreshed: set[str],
+    now: float,
+) -> int:
+    """Age in seconds of a PON entry; 0 for PONs refreshed in this run."""
+    if pon_name in refreshed:
+        return 0
+    return max(0, round(now - entry["collected_at"]))
+
+
+def merge_pon_entries(
+    pon_pairs: set[tuple[str, str]],
+    entries: dict[str, dict[str, Any]],
+    now: float,
+    refreshed: set[str] = frozenset(),
+) -> tuple[list, list]:
+    """
+    Merge fresh and cached per-PON entries.
+
+    Each entry gets "refreshed" (collected in this run) and an age in
+    seconds, which is 0 for refreshed PONs and measured from the cached
+    collection time otherwise.
+    """
+    pon_signals: list = []
+    pon_optics: list = []
+
+    for slot, pon in sorted(pon_pairs):
+        pon_name = f"{slot}/{pon}"
+        entry = entries.get(pon_name)
+        if entry is None:
+            continue
+        fresh = {
+            "age": entry_age(pon_name, entry, refreshed, now),
+            "refreshed": pon_name in refreshed,
+        }
+        if entry["signals"]:
+            pon_signals.append({**entry["signals"], **fresh})
+        if entry["optics"]:
+            pon_optics.append({**entry["optics"], **fresh})
+
+    return pon_signals, pon_optics
+
+
+def build_worst_onus(
+    pon_pairs: set[tuple[str, str]],
+    entries: dict[str, dict[str, Any]],
+    records: dict[tuple[str, str, str], ONURecord],
+    now: float,
+    refreshed: set[str] = frozenset(),
+) -> dict[str, Any]:
+    """Join worst RECV_POWER readings with ONU identity, globally and per PON."""
+    per_pon: dict[str, list] = {}
+    candidates: list[dict[str, Any]] = []
+
+    for slot, pon in sorted(pon_pairs):
+        pon_name = f"{slot}/{pon}"
+        entry = entries.get(pon_name)
+        if entry is None:
+            continue
+        age = entry_age(pon_name, entry, refreshed, now)
+        onus = []
+        for onu, power in entry.get("worst", []):
+            record = records.get((slot, pon, onu))
+            onus.append(
+                {
+                    "slot": slot,
+                    "pon": pon,
+                    "onu": onu,
+                    "pon_name": pon_name,
+                    "recv_power": power,
+                    "onu_type": record.onu_type if record else None,
+                    "phy_id": record.phy_id if record else None,
+                    "status": record.status if record else None,
+                    "age": age,
+                }
+            )
+        per_pon[pon_name] = onus[:WORST_ONU_PER_PON]
+        candidates.extend(onus)
+
+    return {
+        "global": heapq.nsmallest(
+            WORST_ONU_COUNT, candidates, key=lambda onu: onu["recv_power"]
+        ),
+        "per_pon": per_pon,
+    }
+
+
+async def _close_session(stack: AsyncExitStack) -> None:
+    try:
+        await stack.aclose()
+    except Exception as exc:
+        logger.debug("Ignoring session close error: %s", exc)
+
+
 async def collect_olt_signals(
     ip: str,
     user: str,
     password: str,
-    port: int = 23,
+    port: int | str = 23,
+    client_factory: Callable[..., FiberhomeClient] = FiberhomeClient,
+    deadline: float = SIGNALS_DEADLINE,
+    dialect: Dialect = DEFAULT_DIALECT,
 ) -> dict[str, Any]:
-    """Collect OLT optical signal data."""
+    """
+    Collect OLT optical signal data within a time budget.
+
+    PONs are swept round-robin from the cursor persisted by the previous
+    run until the deadline would be exceeded. Results not refreshed in
+    this run are served from the cache with their age.
+    """
     start_time = perf_counter()
-    pon_signals: list = []
+    deadline_at = start_time + deadline - SIGNALS_EXIT_RESERVE
+    state = load_state(ip, SWEEP_STATE)
+    entries: dict[str, dict[str, Any]] = state.get("pons", {})
+    cursor: list[str] | None = state.get("cursor")
+    pon_estimate = state.get("pon_seconds", CMD_WAIT_SIGNAL)
+    pon_pairs = {tuple(name.split("/", 1)) for name in entries}
+    records: dict[tuple[str, str, str], ONURecord] = {}
+    collected: list[str] = []
+    # Per-ONU readings go to the ONU index, not to the bounded sweep cache.
+    onu_readings: dict[str, tuple[float, list[tuple[str, float]]]] = {}
+    failed: list[str] = []
+    success = True
+    error: str | None = None
+
+    stack = AsyncExitStack()
 
     try:
-        async with FiberhomeClient(ip, user, password, port) as client:
-            auth_output = await client.collect_onu_authorization()
-            pon_pairs = extract_pon_pairs(auth_output)
-            logger.info("Discovered %s PONs with ONUs on %s", len(pon_pairs), ip)
-
-            for slot, pon in sorted(pon_pairs):
-                signal_output = await client.collect_pon_signals(slot, pon)
-                signals = parse_pon_signals(signal_output, slot, pon)
-                if signals:
-                    pon_signals.append(
-                        {
-                            "slot": signals.slot,
-                            "pon": signals.pon,
-                            "pon_name": signals.pon_name,
-                            "best_signal": signals.best_signal,
-                            "poor_signal": signals.poor_signal,
-                            "median_signal": signals.median_signal,
-                            "onu_count": signals.onu_count,
-                        }
+        client = await stack.enter_async_context(
+            client_factory(ip, user, password, port, dialect=dialect)
+        )
+        auth_output = await client.collect_onu_authorization(
+            timeout=max(1.0, deadline_at - perf_counter())
+        )
+        pon_pairs = extract_pon_pairs(auth_output)
+        records = parse_onu_records(auth_output)
+        try:
+            save_onu_records(ip, records)
+        except OSError as exc:
+            logger.warning("Failed to update ONU index for %s: %s", ip, exc)
+        logger.info("Discovered %s PONs with ONUs on %s", len(pon_pairs), ip)
+
+        for slot, pon in sweep_order(pon_pairs, cursor):
+            remaining = deadline_at - perf_counter()
+            if remaining < pon_estimate:
+                logger.info("Signals deadline reached on %s after %s PONs", ip, len(collected))
+                break
+
+            pon_name = f"{slot}/{pon}"
+            pon_started = perf_counter()
+            cursor = [slot, pon]
+            if client is None:
+                # Reopen after a failed PON, leaving time for at least one PON.
+                login_timeout = min(TELNET_TIMEOUT, remaining - pon_estimate)
+                if login_timeout < SIGNALS_RELOGIN_MIN:
+                    logger.info(
+                        "No time left to reopen the session on %s after %s PONs",
+                        ip,
+                        len(collected),
                     )
+                    break
+                try:
+                    client = await stack.enter_async_context(
+                        client_factory(
+                            ip, user, password, port, dialect=dialect, timeout=login_timeout
+                        )
+                    )
+                except Exception as exc:
+                    logger.warning("Failed to reopen the session on %s: %s", ip, exc)
+                    break
+            try:
+                signal_output = await client.collect_pon_signals(
+                    slot,
+                    pon,
+                    timeout=min(CMD_TIMEOUT_SIGNAL, remaining),
+                )
+            except Exception as exc:
+                logger.warning("Failed to collect PON %s on %s: %s", pon_name, ip, exc)
+                failed.append(pon_name)
+                # The session may still be in card context with unread output
+                # from the failed command; reopen it before the next PON.
+                await _close_session(stack)
+                stack = AsyncExitStack()
+                client = None
+                continue
 
-        collection_time = (perf_counter() - start_time) * 1000
-        logger.info(
-            "Collected signals from %s: %s PONs in %.0fms",
-            ip,
-            len(pon_signals),
-            collection_time,
-        )
-        return build_response(pon_signals, collection_time, ip, success=True)
+            readings = parse_onu_signals(signal_output)
+            entries[pon_name] = collect_pon_entry(signal_output, slot, pon, dialect, readings)
+            onu_readings[pon_name] = (entries[pon_name]["collected_at"], readings)
+            collected.append(pon_name)
+            pon_estimate = 0.7 * pon_estimate + 0.3 * (perf_counter() - pon_started)
     except Exception as exc:
-        collection_time = (perf_counter() - start_time) * 1000
+        success = False
+        error = str(exc)
         logger.error("Failed to collect signals from %s: %s", ip, exc)
-        return build_response(
-            pon_signals,
-            collection_time,
+    finally:
+        await _close_session(stack)
+
+    current = {f"{slot}/{pon}" for slot, pon in pon_pairs}
+    try:
+        save_state(
+            ip,
+            SWEEP_STATE,
+            {
+                "cursor": cursor,
+                "pon_seconds": round(pon_estimate, 3),
+                "pons": {name: entry for name, entry in entries.items() if name in current},
+            },
+        )
+    except OSError as exc:
+        logger.warning("Failed to save signals sweep state for %s: %s", ip, exc)
+    try:
+        save_onu_signals(ip, onu_readings, current)
+    except OSError as exc:
+        logger.warning("Failed to update ONU signals for %s: %s", ip, exc)
+
+    now = time()
+    refreshed = set(collected)
+    pon_signals, pon_optics = merge_pon_entries(pon_pairs, entries, now, refreshed)
+    worst_onus = build_worst_onus(pon_pairs, entries, records, now, refreshed)
+    collection_time = (perf_counter() - start_time) * 1000
+    if success:
+        logger.info(
+            "Collected signals from %s: %s/%s PONs refreshed in %.0fms",
             ip,
-            success=False,
-            error=str(exc),
+            len(collected),
+            len(pon_pairs),
+            collection_time,
         )
+    response = build_response(
+        pon_signals,
+        collection_time,
+        ip,
+        success=success,
+        error=error,
+        pon_optics=pon_optics,
+        sweep={
+            "pons_total": len(pon_pairs),
+            "pons_refreshed": len(collected),
+            "pons_failed": failed,
+            "complete": success and len(collected) == len(pon_pairs),
+        },
+        worst_onus=worst_onus,
+    )
+    save_last_response(ip, "signals", response)
+    return response
 
 
 def main() -> int:
@@ -110,7 +410,13 @@ def main() -> int:
     if len(sys.argv) < 4:
         print(
             json.dumps(
-                {"error": "Usage: fiberhome_olt_signals.py <ip> <user> <password> [port]"}
+                {
+                    "error": (
+                        "Usage: fiberhome_olt_signals.py <ip> <user> <password> "
+                        "[port|ssh:port|ssh+zlib:port] [deadline_seconds] "
+                        "[zabbix_server[:port] [zabbix_host]]"
+                    )
+                }
             ),
             file=sys.stdout,
         )
@@ -119,10 +425,17 @@ def main() -> int:
     ip = sys.argv[1]
     user = sys.argv[2]
     password = sys.argv[3]
-    port = int(sys.argv[4]) if len(sys.argv) > 4 else 23
+    port = sys.argv[4] if len(sys.argv) > 4 else 23
+    deadline = float(sys.argv[5]) if len(sys.argv) > 5 else SIGNALS_DEADLINE
 
-    result = asyncio.run(collect_olt_signals(ip, user, password, port))
-    print(json.dumps(result, indent=2))
+    with capture_profile("signals", ip):
+        result = asyncio.run(collect_olt_signals(ip, user, password, port, deadline=deadline))
+        output = json.dumps(result, indent=2)
+    print(output)
+    if len(sys.argv) > 6:
+        # Push mode: send the values to trapper items of the named host.
+        host = sys.argv[7] if len(sys.argv) > 7 else ip
+        sender_from_spec(sys.argv[6]).send(response_values(host, result))
     return 0 if result["data"]["metadata"]["success"] else 1
 
 
@@ -4,23 +4,65 @@ fiberhome_olt_status.py — Master Item for Zabbix Dependent Items.
 
 Collects ONU Online/Offline/Provisioned counts per PON and returns
 JSON for Zabbix to parse via JSONPath preprocessing.
+
+ONU states are diffed against the previous run; ONUs that went down or
+are flapping get a per-ONU detail query (last down cause/time, distance)
+within a fixed per-run command budget, so the cost follows churn rather
+than the ONU count. ONUs left over by the budget are deferred to the next
+run and queried first.
+
+In "slots" mode the authorization table is read with one query per line
+card (slot list from the LLD/ONU index cache) instead of one monolithic
+command. Slots run over one or more sessions ("slots:N"), each result is
+merged as it arrives, a failed slot is retried on its own, and a slot that
+still fails keeps its previous rows. Slots not started before the overall
+deadline are kept stale as well. The response carries per-slot success
+flags instead of failing the whole poll.
+
+With a Zabbix server argument the result is also pushed to trapper items
+of the given host (default: the OLT IP), as fiberhome_olt_fleet.py does.
 """
 
 import asyncio
 import json
 import logging
 import sys
+from collections import deque
+from collections.abc import Callable
+from contextlib import AsyncExitStack
 from datetime import datetime, timezone
 from pathlib import Path
-from time import perf_counter
+from time import perf_counter, time
 from typing import Any
 
 from fiberhome.bootstrap import reexec_with_venv
 
 reexec_with_venv(Path(__file__).resolve().parent)
 
-from fiberhome.parsers import parse_onu_authorization
+from fiberhome.constants import (
+    AUTH_SLOT_RETRIES,
+    AUTH_SLOT_TIMEOUT,
+    DRILLDOWN_BUDGET,
+    DRILLDOWN_MIN_SECONDS,
+    FLAP_TRANSITIONS,
+    FLAP_WINDOW,
+    STATUS_DEADLINE,
+    TELNET_TIMEOUT,
+    ONURecord,
+)
+from fiberhome.dialects import Dialect, select_dialect
+from fiberhome.metrics import save_last_response
+from fiberhome.onu_index import (
+    known_slots,
+    load_onu_records,
+    save_onu_records,
+    slot_collected_at,
+)
+from fiberhome.parsers import parse_onu_records, summarize_onu_records
+from fiberhome.profiling import capture_profile
 from fiberhome.scrapli_client import FiberhomeClient
+from fiberhome.state import load_state, save_state
+from fiberhome.zabbix_sender import response_values, sender_from_spec
 
 if not logging.getLogger().handlers:
     logging.basicConfig(
@@ -30,6 +72,10 @@ if not logging.getLogger().handlers:
     )
 logger = logging.getLogger(__name__)
 
+CHANGES_STATE = "onu_changes"
+DRILLDOWN_STATE = "onu_drilldown"
+AUTH_MODES = ("all", "slots")
+
 
 def build_response(
     pon_stats: dict,
@@ -37,8 +83,20 @@ def build_response(
     olt_ip: str,
     success: bool = True,
     error: str | None = None,
+    changed_onus: list | None = None,
+    drilldown_commands: int = 0,
+    slots: list | None = None,
+    auth_mode: str = "all",
+    slot_collected_at: dict[str, float] | None = None,
 ) -> dict[str, Any]:
-    """Build JSON response structure."""
+    """
+    Build JSON response structure.
+
+    slot_collected_at maps the slots carried over from an earlier run to
+    when they were collected; their PONs report that age instead of 0.
+    """
+    now = time()
+    carried = slot_collected_at or {}
     pon_ports = []
     total_provisioned = 0
     total_online = 0
@@ -53,6 +111,7 @@ def build_response(
                 "online": stats.online,
                 "offline": stats.offline,
                 "provisioned": stats.provisioned,
+                "age": max(0, round(now - carried[stats.slot])) if stats.slot in carried else 0,
             }
         )
         total_provisioned += stats.provisioned
@@ -67,31 +126,410 @@ def build_response(
                 "online": total_online,
                 "offline": total_offline,
             },
+            "changed_onus": changed_onus or [],
             "metadata": {
                 "timestamp": datetime.now(timezone.utc).isoformat(),
                 "collection_time_ms": round(collection_time_ms),
                 "olt_ip": olt_ip,
                 "success": success,
                 "error": error,
+                "onus_changed": len(changed_onus or []),
+                "drilldown_commands": drilldown_commands,
+                "auth_mode": auth_mode,
+                "slots": slots or [],
+                "stale_slots": [entry["slot"] for entry in slots or [] if not entry["success"]],
+                "complete": success and all(entry["success"] for entry in slots or []),
             },
         }
     }
 
 
+def track_onu_changes(
+    ip: str,
+    records: dict[tuple[str, str, str], ONURecord],
+    now: float,
+) -> list[dict[str, Any]]:
+    """
+    Diff ONU states against the previous status run.
+
+    Returns one entry per ONU whose state changed, flagged as flapping when
+    it changed FLAP_TRANSITIONS times within FLAP_WINDOW. ONUs seen for the
+    first time are not reported.
+    """
+    state = load_state(ip, CHANGES_STATE)
+    previous: dict[str, str] = state.get("status", {})
+    cutoff = now - FLAP_WINDOW
+    history: dict[str, list[float]] = {
+        key: [at for at in times if at >= cutoff]
+        for key, times in state.get("history", {}).items()
+    }
+
+    changes: list[dict[str, Any]] = []
+    for record in records.values():
+        key = f"{record.slot}/{record.pon}/{record.onu}"
+        before = previous.get(key)
+        if before is None or before == record.status:
+            continue
+        history.setdefault(key, []).append(now)
+        changes.append(
+            {
+                "slot": record.slot,
+                "pon": record.pon,
+                "onu": record.onu,
+                "pon_name": f"{record.slot}/{record.pon}",
+                "phy_id": record.phy_id,
+                "previous_status": before,
+                "status": record.status,
+                "flapping": len(history[key]) >= FLAP_TRANSITIONS,
+                "deferred": False,
+                "details": None,
+            }
+        )
+
+    save_state(
+        ip,
+        CHANGES_STATE,
+        {
+            "status": {
+                f"{r.slot}/{r.pon}/{r.onu}": r.status for r in records.values()
+            },
+            "history": {key: times for key, times in history.items() if times},
+        },
+    )
+    return changes
+
+
+def drilldown_targets(
+    changes: list[dict[str, Any]],
+    budget: int | None = DRILLDOWN_BUDGET,
+    deferred: list[dict[str, Any]] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Pick the changed ONUs worth a detail query.
+
+    ONUs deferred by earlier runs come first, then down, then flapping.
+    budget=None returns the whole queue.
+    """
+    candidates = [change for change in changes if change["status"] == "dn" or change["flapping"]]
+    candidates.sort(key=lambda change: (change["status"] != "dn", not change["flapping"]))
+    return [*(deferred or []), *candidates][:budget]
+
+
+def load_deferred(
+    ip: str,
+    changes: list[dict[str, Any]],
+    records: dict[tuple[str, str, str], ONURecord],
+) -> list[dict[str, Any]]:
+    """Return ONUs deferred by earlier runs that still exist and did not change again."""
+    changed = {(change["slot"], change["pon"], change["onu"]) for change in changes}
+    deferred = []
+    for change in load_state(ip, DRILLDOWN_STATE).get("pending", []):
+        position = (change["slot"], change["pon"], change["onu"])
+        if position in records and position not in changed:
+            deferred.append({**change, "deferred": True, "details": None})
+    return deferred
+
+
+def defer_remaining(ip: str, queue: list[dict[str, Any]], sent: int) -> None:
+    """Persist the queued ONUs whose detail command was not sent this run."""
+    pending = [
+        {key: value for key, value in change.items() if key not in ("deferred", "details")}
+        for change in queue[sent:]
+    ]
+    try:
+        save_state(ip, DRILLDOWN_STATE, {"pending": pending})
+    except OSError as exc:
+        logger.warning("Failed to save deferred drill-down for %s: %s", ip, exc)
+
+
+def parse_auth_mode(spec: str | None) -> tuple[str, int]:
+    """
+    Parse an authorization mode spec: "all", "slots" or "slots:<sessions>".
+
+    Unknown modes fall back to "all" (one monolithic query).
+    """
+    mode, _, sessions = (spec or "all").partition(":")
+    if mode not in AUTH_MODES:
+        return "all", 1
+    try:
+        return mode, max(1, int(sessions or 1))
+    except ValueError:
+        return mode, 1
+
+
+def track_changes(ip: str, records: dict[tuple[str, str, str], ONURecord]) -> list[dict[str, Any]]:
+    """Run track_onu_changes, treating a state write failure as no changes."""
+    try:
+        return track_onu_changes(ip, records, time())
+    except OSError as exc:
+        logger.warning("Failed to track ONU changes for %s: %s", ip, exc)
+        return []
+
+
+def drilldown_queue(
+    ip: str,
+    dialect: Dialect,
+    changes: list[dict[str, Any]],
+    records: dict[tuple[str, str, str], ONURecord],
+) -> list[dict[str, Any]]:
+    """Queue the ONUs to drill down, deferred ones first; empty without onu_detail."""
+    if not dialect.supports("onu_detail"):
+        return []
+    return drilldown_targets(changes, budget=None, deferred=load_deferred(ip, changes, records))
+
+
+async def drill_down(
+    client: FiberhomeClient,
+    dialect: Dialect,
+    ip: str,
+    targets: list[dict[str, Any]],
+    deadline_at: float | None = None,
+) -> int:
+    """
+    Fill in the details of the targeted changes; failures leave them None.
+
+    Returns the number of detail commands actually sent.
+    """
+    try:
+        outputs = await client.collect_onu_details(
+            [(change["slot"], change["pon"], change["onu"]) for change in targets],
+            deadline_at=deadline_at,
+        )
+    except Exception as exc:
+        logger.warning("ONU drill-down failed on %s: %s", ip, exc)
+        outputs = {}
+    for change in targets:
+        output = outputs.get((change["slot"], change["pon"], change["onu"]))
+        if output is not None:
+            change["details"] = dialect.parse_onu_detail(output)
+    return len(outputs)
+
+
+async def collect_auth_by_slot(
+    ip: str,
+    user: str,
+    password: str,
+    port: int | str,
+    client_factory: Callable[..., FiberhomeClient],
+    dialect: Dialect,
+    slots: list[str],
+    on_slot: Callable[[str, str], None],
+    sessions: int = 1,
+    deadline_at: float | None = None,
+    results: list[dict[str, Any]] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Run one authorization query per slot over up to `sessions` sessions.
+
+    Each slot's output is passed to on_slot(slot, output) as soon as it
+    arrives. A failed slot closes its session (it may be stuck mid-command)
+    and is requeued up to AUTH_SLOT_RETRIES times. No slot is started once
+    the time left before deadline_at (perf_counter) is below the slowest
+    slot so far, and logins and slot commands are capped at the time left.
+    Returns one status entry per slot, filled into `results` when given so
+    the caller keeps them even when every slot fails and this raises.
+    """
+    queue = deque(slots)
+    if results is None:
+        results = []
+    results[:] = [
+        {"slot": slot, "success": False, "attempts": 0, "duration_ms": 0, "error": None}
+        for slot in slots
+    ]
+    status = {entry["slot"]: entry for entry in results}
+    login_errors: list[Exception] = []
+    slowest = 0.0
+    deadline_hit = False
+
+    def time_left() -> float:
+        return deadline_at - perf_counter() if deadline_at is not None else float("inf")
+
+    async def worker() -> None:
+        nonlocal slowest, deadline_hit
+        stack: AsyncExitStack | None = None
+        try:
+            while queue:
+                if time_left() <= slowest:
+                    deadline_hit = True
+                    return
+                if stack is None:
+                    stack = AsyncExitStack()
+                    try:
+                        # A login after a failed slot must not outlive the deadline either.
+                        client = await stack.enter_async_context(
+                            client_factory(
+                                ip,
+                                user,
+                                password,
+                                port,
+                                dialect=dialect,
+                                timeout=min(TELNET_TIMEOUT, time_left()),
+                            )
+                        )
+                    except Exception as exc:
+                        logger.warning("Slot session login failed on %s: %s", ip, exc)
+                        login_errors.append(exc)
+                        return
+                    if not queue:
+                        break
+                slot = queue.popleft()
+                entry = status[slot]
+                entry["attempts"] += 1
+                started = perf_counter()
+                try:
+                    output = await client.collect_onu_authorization_slot(
+                        slot, timeout=AUTH_SLOT_TIMEOUT, deadline_at=deadline_at
+                    )
+                except Exception as exc:
+                    logger.warning(
+                        "Authorization query failed on %s slot=%s attempt=%s: %s",
+                        ip,
+                        slot,
+                        entry["attempts"],
+                        exc,
+                    )
+                    entry["error"] = str(exc)
+                    await _close_session(stack)
+                    stack = None
+                    if entry["attempts"] <= AUTH_SLOT_RETRIES:
+                        queue.append(slot)
+                    continue
+                finally:
+                    slowest = max(slowest, perf_counter() - started)
+                    entry["duration_ms"] += round((perf_counter() - started) * 1000)
+                entry.update(success=True, error=None)
+                on_slot(slot, output)
+        finally:
+            if stack is not None:
+                await _close_session(stack)
+
+    await asyncio.gather(*(worker() for _ in range(min(sessions, len(slots)))))
+
+    if deadline_hit:
+        logger.info("Authorization deadline reached on %s with slots %s left", ip, list(queue))
+    for entry in results:
+        if not entry["attempts"]:
+            if login_errors:
+                entry["error"] = str(login_errors[0])
+            elif deadline_hit:
+                entry["error"] = "deadline reached before the slot was queried"
+    if not any(entry["success"] for entry in results):
+        if login_errors:
+            raise login_errors[0]
+        raise RuntimeError(f"Authorization query failed on every slot: {results[0]['error']}")
+    return results
+
+
+async def _close_session(stack: AsyncExitStack) -> None:
+    try:
+        await stack.aclose()
+    except Exception as exc:
+        logger.debug("Ignoring session close error: %s", exc)
+
+
 async def collect_olt_status(
     ip: str,
     user: str,
     password: str,
-    port: int = 23,
+    port: int | str = 23,
+    client_factory: Callable[..., FiberhomeClient] = FiberhomeClient,
+    auth_mode: str = "all",
+    deadline: float = STATUS_DEADLINE,
+    dialect: Dialect | None = None,
 ) -> dict[str, Any]:
-    """Collect OLT status data."""
+    """
+    Collect OLT status data.
+
+    The dialect defaults to select_dialect(ip). deadline bounds the slot
+    sweep and the ONU drill-down (which is deferred when less than
+    DRILLDOWN_MIN_SECONDS are left), in both authorization modes.
+    """
     start_time = perf_counter()
+    deadline_at = start_time + deadline
+    if dialect is None:
+        dialect = select_dialect(ip)
+    slots: list[str] = []
     pon_stats: dict = {}
+    slot_status: list[dict[str, Any]] = []
+    mode, sessions = parse_auth_mode(auth_mode)
+    queue: list[dict[str, Any]] = []
+    sent = 0
+    carried_at: dict[str, float] = {}
 
     try:
-        async with FiberhomeClient(ip, user, password, port) as client:
-            auth_output = await client.collect_onu_authorization()
-            pon_stats = parse_onu_authorization(auth_output)
+        slots = known_slots(ip) if mode == "slots" and dialect.supports("auth_slot") else []
+        if slots:
+            records: dict[tuple[str, str, str], ONURecord] = {}
+
+            def merge(slot: str, output: str) -> None:
+                pon_stats.update(dialect.parse_authorization(output))
+                records.update(parse_onu_records(output))
+
+            await collect_auth_by_slot(
+                ip,
+                user,
+                password,
+                port,
+                client_factory,
+                dialect,
+                slots,
+                merge,
+                sessions,
+                deadline_at=deadline_at,
+                results=slot_status,
+            )
+            stale = {entry["slot"] for entry in slot_status if not entry["success"]}
+            if stale:
+                # Keep the previous rows of failed slots instead of reporting zeros,
+                # along with when they were collected.
+                previous = {
+                    key: record
+                    for key, record in load_onu_records(ip).items()
+                    if record.slot in stale
+                }
+                records.update(previous)
+                pon_stats.update(summarize_onu_records(previous))
+                carried_at = {
+                    slot: collected_at
+                    for slot, collected_at in slot_collected_at(ip).items()
+                    if slot in stale
+                }
+
+            changed_onus = track_changes(ip, records)
+            queue = drilldown_queue(ip, dialect, changed_onus, records)
+            # Without enough time left the drill-down is deferred to the next run.
+            if queue and deadline_at - perf_counter() >= DRILLDOWN_MIN_SECONDS:
+                try:
+                    async with client_factory(
+                        ip, user, password, port, dialect=dialect
+                    ) as client:
+                        sent = await drill_down(
+                            client, dialect, ip, queue[:DRILLDOWN_BUDGET], deadline_at
+                        )
+                except Exception as exc:
+                    logger.warning("ONU drill-down session failed on %s: %s", ip, exc)
+        else:
+            async with client_factory(ip, user, password, port, dialect=dialect) as client:
+                auth_output = await client.collect_onu_authorization()
+                pon_stats = dialect.parse_authorization(auth_output)
+                records = parse_onu_records(auth_output)
+
+                changed_onus = track_changes(ip, records)
+                queue = drilldown_queue(ip, dialect, changed_onus, records)
+                if queue and deadline_at - perf_counter() >= DRILLDOWN_MIN_SECONDS:
+                    sent = await drill_down(
+                        client, dialect, ip, queue[:DRILLDOWN_BUDGET], deadline_at
+                    )
+
+        if dialect.supports("onu_detail"):
+            # Deferred ONUs queried in this run are reported with their details.
+            changed_onus.extend(change for change in queue[:sent] if change["deferred"])
+            defer_remaining(ip, queue, sent)
+
+        try:
+            save_onu_records(ip, records, slot_collected_at=carried_at)
+        except OSError as exc:
+            logger.warning("Failed to update ONU index for %s: %s", ip, exc)
 
         collection_time = (perf_counter() - start_time) * 1000
         logger.info(
@@ -101,25 +539,46 @@ async def collect_olt_status(
             sum(s.provisioned for s in pon_stats.values()),
             collection_time,
         )
-        return build_response(pon_stats, collection_time, ip, success=True)
+        response = build_response(
+            pon_stats,
+            collection_time,
+            ip,
+            success=True,
+            changed_onus=changed_onus,
+            drilldown_commands=sent,
+            slots=slot_status,
+            auth_mode="slots" if slots else "all",
+            slot_collected_at=carried_at,
+        )
     except Exception as exc:
         collection_time = (perf_counter() - start_time) * 1000
         logger.error("Failed to collect from %s: %s", ip, exc)
-        return build_response(
+        response = build_response(
             pon_stats,
             collection_time,
             ip,
             success=False,
             error=str(exc),
+            slots=slot_status,
+            auth_mode="slots" if slots else "all",
         )
 
+    save_last_response(ip, "status", response)
+    return response
+
 
 def main() -> int:
     """Entry point for Zabbix external check."""
     if len(sys.argv) < 4:
         print(
             json.dumps(
-                {"error": "Usage: fiberhome_olt_status.py <ip> <user> <password> [port]"}
+                {
+                    "error": (
+                        "Usage: fiberhome_olt_status.py <ip> <user> <password> "
+                        "[port|ssh:port|ssh+zlib:port] [all|slots|slots:<sessions>] "
+                        "[zabbix_server[:port] [zabbix_host]]"
+                    )
+                }
             ),
             file=sys.stdout,
         )
@@ -128,10 +587,17 @@ def main() -> int:
     ip = sys.argv[1]
     user = sys.argv[2]
     password = sys.argv[3]
-    port = int(sys.argv[4]) if len(sys.argv) > 4 else 23
+    port = sys.argv[4] if len(sys.argv) > 4 else 23
+    auth_mode = sys.argv[5] if len(sys.argv) > 5 else "all"
 
-    result = asyncio.run(collect_olt_status(ip, user, password, port))
-    print(json.dumps(result, indent=2))
+    with capture_profile("status", ip):
+        result = asyncio.run(collect_olt_status(ip, user, password, port, auth_mode=auth_mode))
+        output = json.dumps(result, indent=2)
+    print(output)
+    if len(sys.argv) > 6:
+        # Push mode: send the values to trapper items of the named host.
+        host = sys.argv[7] if len(sys.argv) > 7 else ip
+        sender_from_spec(sys.argv[6]).send(response_values(host, result))
     return 0 if result["data"]["metadata"]["success"] else 1
 
 
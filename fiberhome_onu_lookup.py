@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+fiberhome_onu_lookup.py — Local ONU lookup API for helpdesk queries.
+
+Serves ONU status lookups from the in-memory index built over the state
+written by the scheduled status/signals collections. No lookup logs into
+an OLT; each result carries the age of its data (age for the
+authorization table, signal_age for RECV_POWER).
+
+Usage:
+  fiberhome_onu_lookup.py [--bind 127.0.0.1] [--port 8650] [--refresh SECONDS]
+
+Endpoints (JSON):
+  GET /onu/<phy_id>                          lookup by PhyId/serial
+  GET /olt/<ip>/onu/<slot>/<pon>/<onu>       lookup by position
+  GET /olt/<ip>/pon/<slot>/<pon>             every ONU of one PON
+  GET /olts                                  indexed OLTs and data age
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from fiberhome.bootstrap import reexec_with_venv
+
+reexec_with_venv(Path(__file__).resolve().parent)
+
+from fiberhome.onu_index import INDEX_REFRESH_INTERVAL, OnuIndex
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+logger = logging.getLogger(__name__)
+
+LOOKUP_PORT = 8650
+
+ROUTES = [
+    (re.compile(r"^/onu/(?P<phy_id>[^/]+)$"), "phy_id"),
+    (re.compile(r"^/olt/(?P<olt>[^/]+)/onu/(?P<slot>\d+)/(?P<pon>\d+)/(?P<onu>\d+)$"), "onu"),
+    (re.compile(r"^/olt/(?P<olt>[^/]+)/pon/(?P<slot>\d+)/(?P<pon>\d+)$"), "pon"),
+    (re.compile(r"^/olts$"), "olts"),
+]
+
+
+def lookup(index: OnuIndex, path: str) -> tuple[int, Any]:
+    """Resolve a request path against the index; return (status, body)."""
+    for pattern, route in ROUTES:
+        match = pattern.match(path.split("?", 1)[0].rstrip("/") or "/")
+        if match is None:
+            continue
+        params = match.groupdict()
+        index.maybe_refresh()
+        if route == "phy_id":
+            onus = index.by_phy_id(params["phy_id"])
+            return (200, {"onus": onus}) if onus else (404, {"error": "ONU not found"})
+        if route == "onu":
+            onu = index.by_onu(**params)
+            return (200, onu) if onu else (404, {"error": "ONU not found"})
+        if route == "pon":
+            onus = index.by_pon(**params)
+            return (200, {"onus": onus}) if onus else (404, {"error": "PON not found"})
+        return 200, {"olts": index.summary()}
+    return 404, {"error": "Unknown endpoint"}
+
+
+def make_handler(index: OnuIndex) -> type[BaseHTTPRequestHandler]:
+    class LookupHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            status, body = lookup(index, self.path)
+            payload = json.dumps(body, separators=(",", ":")).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return LookupHandler
+
+
+def make_server(
+    bind: str = "127.0.0.1",
+    port: int = LOOKUP_PORT,
+    refresh: float = INDEX_REFRESH_INTERVAL,
+) -> ThreadingHTTPServer:
+    """Build the lookup server with a freshly loaded index."""
+    index = OnuIndex(refresh_interval=refresh)
+    index.refresh()
+    return ThreadingHTTPServer((bind, port), make_handler(index))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local Fiberhome ONU lookup API")
+    parser.add_argument("--bind", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=LOOKUP_PORT)
+    parser.add_argument("--refresh", type=float, default=INDEX_REFRESH_INTERVAL)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for the lookup service."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    server = make_server(args.bind, args.port, args.refresh)
+    logger.info("ONU lookup listening on %s:%s", args.bind, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import os
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fiberhome.dialects import (
+    DEFAULT_DIALECT,
+    ONU_DETAIL_ENV,
+    RP1000_DETAIL_DIALECT,
+    Dialect,
+    select_dialect,
+)
+from fiberhome.scrapli_client import FiberhomeClient
+
+
+class DialectTests(unittest.TestCase):
+    def test_unsupported_command_is_reported(self) -> None:
+        dialect = Dialect(name="minimal", prompt_pattern="#", commands={})
+
+        self.assertFalse(dialect.supports("signal"))
+        self.assertTrue(DEFAULT_DIALECT.supports("signal"))
+        self.assertEqual(
+            DEFAULT_DIALECT.command("signal", slot="1", pon="2"),
+            "show optic_module_para slot 1 pon 2",
+        )
+        self.assertFalse(DEFAULT_DIALECT.supports("onu_detail"))
+        self.assertEqual(
+            RP1000_DETAIL_DIALECT.command("onu_detail", slot="1", pon="2", onu="3"),
+            "show onu_last_on_and_off_time slot 1 pon 2 onu 3",
+        )
+
+    def test_onu_detail_is_opt_in_per_olt(self) -> None:
+        with patch.dict(os.environ, {ONU_DETAIL_ENV: ""}):
+            self.assertIs(select_dialect("10.0.0.1"), DEFAULT_DIALECT)
+        with patch.dict(os.environ, {ONU_DETAIL_ENV: "10.0.0.1, 10.0.0.2"}):
+            self.assertIs(select_dialect("10.0.0.2"), RP1000_DETAIL_DIALECT)
+            self.assertIs(select_dialect("10.0.0.3"), DEFAULT_DIALECT)
+        with patch.dict(os.environ, {ONU_DETAIL_ENV: "1"}):
+            self.assertIs(select_dialect("10.0.0.3"), RP1000_DETAIL_DIALECT)
+
+
+class DialectClientTests(unittest.IsolatedAsyncioTestCase):
+    @patch("fiberhome.scrapli_client.AsyncGenericDriver")
+    async def test_client_uses_dialect_commands(self, driver_cls: AsyncMock) -> None:
+        driver = AsyncMock()
+        driver.get_prompt = AsyncMock(return_value="Admin#")
+        driver_cls.return_value = driver
+        dialect = Dialect(
+            name="custom",
+            prompt_pattern=r"Admin#\s*$",
+            setup_commands=("terminal length 0",),
+            commands={
+                "onu_context": "cd gpononu",
+                "leave_context": "cd ..",
+                "auth_all": "show authorization slot all pon all",
+            },
+        )
+        client = FiberhomeClient("10.0.0.1", "user", "pass", dialect=dialect)
+
+        await client.connect()
+        await client.collect_onu_authorization()
+
+        sent = [call.args[0] for call in driver.send_command.await_args_list]
+        self.assertEqual(
+            sent,
+            ["terminal length 0", "cd gpononu", "show authorization slot all pon all", "cd .."],
+        )
+        self.assertEqual(driver_cls.call_args.kwargs["comms_prompt_pattern"], r"Admin#\s*$")
+        driver.send_interactive.assert_not_awaited()
+
+    @patch("fiberhome.scrapli_client.AsyncGenericDriver")
+    async def test_drilldown_stops_after_first_failed_detail(self, driver_cls: AsyncMock) -> None:
+        driver = AsyncMock()
+        driver.get_prompt = AsyncMock(return_value="Admin#")
+        driver_cls.return_value = driver
+        client = FiberhomeClient("10.0.0.1", "user", "pass", dialect=RP1000_DETAIL_DIALECT)
+        await client.connect()
+
+        async def send_command(command: str, timeout_ops: float | None = None) -> AsyncMock:
+            if command.endswith("onu 1"):
+                raise TimeoutError("no prompt")
+            return AsyncMock(result="Last Off Time = 2024-05-01 10:00:00")
+
+        driver.send_command.reset_mock()
+        driver.send_command.side_effect = send_command
+        outputs = await client.collect_onu_details([("1", "1", "1"), ("1", "1", "2")])
+
+        self.assertEqual(outputs, {("1", "1", "1"): None})
+        sent = [call.args[0] for call in driver.send_command.await_args_list]
+        self.assertEqual(sent, ["cd onu", "show onu_last_on_and_off_time slot 1 pon 1 onu 1"])
@@ -0,0 +1,103 @@
+import json
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import fiberhome_olt_fleet
+from fiberhome.dialects import DEFAULT_DIALECT
+from fiberhome_olt_fleet import SessionPool, close_shard, run_shard, shard_for, shard_inventory
+
+
+class FakeClient:
+    logins = 0
+
+    def __init__(self, host: str, username: str, password: str, port: int = 23, **kwargs) -> None:
+        self.host = host
+        self.username = username
+        self.port = port
+        self.transport = "telnet"
+        self.dialect = kwargs.get("dialect", DEFAULT_DIALECT)
+        self.timeout = kwargs.get("timeout", 15)
+        self.reusable = False
+        self.alive = True
+
+    async def connect(self) -> None:
+        FakeClient.logins += 1
+        self.reusable = True
+
+    async def is_alive(self, timeout: float = 5) -> bool:
+        return self.reusable and self.alive
+
+    async def disconnect(self) -> None:
+        self.reusable = False
+
+
+class FleetShardingTests(unittest.TestCase):
+    def test_shard_assignment_is_stable(self) -> None:
+        inventory = [{"ip": f"10.0.0.{i}"} for i in range(50)]
+
+        first = shard_inventory(inventory, 4)
+        second = shard_inventory(list(reversed(inventory)), 4)
+
+        for index in range(4):
+            self.assertEqual(
+                sorted(olt["ip"] for olt in first[index]),
+                sorted(olt["ip"] for olt in second[index]),
+            )
+            for olt in first[index]:
+                self.assertEqual(shard_for(olt["ip"], 4), index)
+
+    def test_run_shard_returns_serialized_results(self) -> None:
+        collector = AsyncMock(
+            return_value={"data": {"pon_ports": [], "metadata": {"success": True}}}
+        )
+        shard = [{"name": "olt-a", "ip": "10.0.0.1", "user": "u", "password": "p", "port": 23}]
+
+        self.addCleanup(close_shard)
+        with patch.dict(fiberhome_olt_fleet.COLLECTORS, {"status": collector}):
+            lines = run_shard(shard, "status")
+            loop = fiberhome_olt_fleet._loop
+            run_shard(shard, "status")
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["data"]["metadata"]["olt_name"], "olt-a")
+        collector.assert_awaited_with(
+            "10.0.0.1", "u", "p", 23, client_factory=fiberhome_olt_fleet._pool.factory
+        )
+        # Later cycles run on the same event loop.
+        self.assertIs(fiberhome_olt_fleet._loop, loop)
+
+
+class SessionPoolTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        FakeClient.logins = 0
+        self.pool = SessionPool(client_class=FakeClient)
+
+    async def _cycle(self, fail: bool = False) -> FakeClient:
+        async with self.pool.factory("10.0.0.1", "u", "p", 23) as client:
+            if fail:
+                client.reusable = False
+        return client
+
+    async def test_session_is_reused_across_cycles(self) -> None:
+        first = await self._cycle()
+        second = await self._cycle()
+
+        self.assertIs(first, second)
+        self.assertEqual(FakeClient.logins, 1)
+
+    async def test_failed_or_dead_session_is_replaced(self) -> None:
+        first = await self._cycle(fail=True)
+        second = await self._cycle()
+        second.alive = False
+        third = await self._cycle()
+
+        self.assertIsNot(first, second)
+        self.assertIsNot(second, third)
+        self.assertEqual(FakeClient.logins, 3)
+
+    async def test_session_with_capped_login_timeout_is_not_kept(self) -> None:
+        async with self.pool.factory("10.0.0.1", "u", "p", 23, timeout=3):
+            pass
+        await self._cycle()
+
+        self.assertEqual(FakeClient.logins, 2)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from time import time
+from unittest.mock import patch
+
+from fiberhome.constants import LLD_PRUNE_GRACE_HOURS, ONURecord
+from fiberhome.onu_index import save_onu_records
+from fiberhome.state import STATE_DIR_ENV
+from fiberhome_olt_lld import filter_pons, parse_grace_hours, pon_occupancy
+
+PONS = [
+    {"portIndex": "34078720", "slot": "1", "pon": "1", "name": "1/1", "alias": ""},
+    {"portIndex": "34603008", "slot": "1", "pon": "2", "name": "1/2", "alias": ""},
+    {"portIndex": "35127296", "slot": "1", "pon": "3", "name": "1/3", "alias": ""},
+]
+
+
+def _records(*pairs: tuple[str, str]) -> dict:
+    return {
+        (slot, pon, "1"): ONURecord(slot, pon, "1", "HG260", "up", f"FHTT{slot}{pon}")
+        for slot, pon in pairs
+    }
+
+
+class LldPruneTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {STATE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def test_emptied_pon_is_kept_during_grace_period(self) -> None:
+        now = time()
+        save_onu_records("10.0.0.1", _records(("1", "1"), ("1", "2")), collected_at=now - 7200)
+        self.assertEqual(pon_occupancy("10.0.0.1", grace_hours=24, now=now), {"1/1", "1/2"})
+
+        save_onu_records("10.0.0.1", _records(("1", "1")), collected_at=now)
+        self.assertEqual(pon_occupancy("10.0.0.1", grace_hours=24, now=now), {"1/1", "1/2"})
+        self.assertEqual(pon_occupancy("10.0.0.1", grace_hours=1, now=now), {"1/1"})
+
+    def test_carried_slot_does_not_renew_the_grace_period(self) -> None:
+        now = time()
+        save_onu_records(
+            "10.0.0.1",
+            _records(("1", "1"), ("2", "1")),
+            collected_at=now,
+            slot_collected_at={"2": now - 7200},
+        )
+
+        self.assertEqual(pon_occupancy("10.0.0.1", grace_hours=1, now=now), {"1/1"})
+
+    def test_filter_modes(self) -> None:
+        occupancy = {"1/1"}
+
+        self.assertEqual(filter_pons(PONS, occupancy, "all"), PONS)
+        self.assertEqual([p["name"] for p in filter_pons(PONS, occupancy, "occupied")], ["1/1"])
+        self.assertEqual(
+            [p["occupied"] for p in filter_pons(PONS, occupancy, "annotate")],
+            [True, False, False],
+        )
+
+    def test_without_cache_nothing_is_pruned(self) -> None:
+        occupancy = pon_occupancy("10.0.0.9")
+
+        self.assertIsNone(occupancy)
+        self.assertEqual(len(filter_pons(PONS, occupancy, "occupied")), 3)
+
+    def test_invalid_or_missing_grace_falls_back_to_default(self) -> None:
+        argv = ["lld.py", "ip", "public", "host", "u", "p", "23", "161", "occupied"]
+
+        self.assertEqual(parse_grace_hours([*argv, "6"]), 6.0)
+        self.assertEqual(
+            parse_grace_hours([*argv, "{$PON_LLD_GRACE_HOURS}"]), LLD_PRUNE_GRACE_HOURS
+        )
+        self.assertEqual(parse_grace_hours(argv), LLD_PRUNE_GRACE_HOURS)
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+from unittest.mock import patch
+
+from fiberhome.constants import PONStats
+from fiberhome.metrics import MetricsCache, save_last_response
+from fiberhome.state import STATE_DIR_ENV
+from fiberhome_olt_exporter import make_server
+from fiberhome_olt_status import build_response
+
+
+def status_response(ip: str, online: int, success: bool = True) -> dict:
+    stats = {"1/1": PONStats(slot="1", pon="1", pon_name="1/1", online=online, offline=1)}
+    return build_response(stats if success else {}, 1234, ip, success=success)
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {STATE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def test_renders_cached_pon_and_collection_metrics(self) -> None:
+        save_last_response("10.0.0.1", "status", status_response("10.0.0.1", online=7))
+        save_last_response("10.0.0.2", "status", status_response("10.0.0.2", online=3))
+
+        text = MetricsCache().render()
+
+        self.assertIn('fiberhome_pon_onus_online{olt="10.0.0.1",slot="1",pon="1"} 7', text)
+        self.assertIn('fiberhome_pon_onus_online{olt="10.0.0.2",slot="1",pon="1"} 3', text)
+        self.assertIn(
+            'fiberhome_collection_duration_seconds{olt="10.0.0.1",collector="status"} 1.234',
+            text,
+        )
+        self.assertIn('fiberhome_collection_age_seconds{olt="10.0.0.1",collector="status"}', text)
+        # Each family is emitted as one contiguous group.
+        self.assertEqual(text.count("# TYPE fiberhome_pon_onus_online gauge"), 1)
+
+    def test_failed_attempt_keeps_last_data(self) -> None:
+        save_last_response("10.0.0.1", "status", status_response("10.0.0.1", online=7))
+        cache = MetricsCache()
+        cache.render()
+
+        save_last_response("10.0.0.1", "status", status_response("10.0.0.1", 0, success=False))
+        text = cache.render()
+
+        self.assertIn('fiberhome_pon_onus_online{olt="10.0.0.1",slot="1",pon="1"} 7', text)
+        self.assertIn('fiberhome_collection_success{olt="10.0.0.1",collector="status"} 0', text)
+
+    def test_http_endpoint_serves_metrics(self) -> None:
+        save_last_response("10.0.0.1", "status", status_response("10.0.0.1", online=7))
+        server = make_server("127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                content_type = response.headers["Content-Type"]
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertTrue(content_type.startswith("text/plain; version=0.0.4"))
+        self.assertIn("fiberhome_collection_success", body)
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from time import time
+from unittest.mock import patch
+
+from fiberhome.onu_index import ONU_SIGNALS_STATE, OnuIndex, save_onu_records, save_onu_signals
+from fiberhome.parsers import parse_onu_records
+from fiberhome.state import STATE_DIR_ENV, load_state
+from fiberhome_onu_lookup import make_server
+
+AUTH_OUTPUT = """
+----- ONU Auth Table, SLOT = 1, PON = 1, ITEM = 2 -----
+Slot Pon Onu OnuType  ST Lic OST PhyId
+1    1   1   HG260    A  1   up  SHLN3c27de63
+1    1   2   HG260    A  1   dn  ZTEGd1ee503c
+"""
+
+
+class OnuIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {STATE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+        save_onu_records("10.0.0.1", parse_onu_records(AUTH_OUTPUT), collected_at=time() - 60)
+        save_onu_signals("10.0.0.1", {"1/1": (time() - 120, [("1", -21.5)])}, {"1/1"})
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def test_lookups_carry_data_age(self) -> None:
+        index = OnuIndex()
+        index.refresh()
+
+        [onu] = index.by_phy_id("shln3c27de63")
+        self.assertEqual((onu["olt"], onu["pon_name"], onu["onu"]), ("10.0.0.1", "1/1", "1"))
+        self.assertEqual(onu["recv_power"], -21.5)
+        self.assertGreaterEqual(onu["age"], 60)
+        self.assertGreaterEqual(onu["signal_age"], 120)
+
+        self.assertEqual(index.by_onu("10.0.0.1", "1", "1", "2")["status"], "dn")
+        self.assertIsNone(index.by_onu("10.0.0.1", "1", "1", "2")["recv_power"])
+        self.assertEqual([onu["onu"] for onu in index.by_pon("10.0.0.1", "1", "1")], ["1", "2"])
+        self.assertEqual(index.by_pon("10.0.0.9", "1", "1"), [])
+
+    def test_refresh_picks_up_new_collections(self) -> None:
+        index = OnuIndex()
+        index.refresh()
+        save_onu_records(
+            "10.0.0.2",
+            parse_onu_records(AUTH_OUTPUT.replace("SHLN3c27de63", "FHTT00000001")),
+        )
+
+        index.refresh()
+
+        self.assertEqual(index.by_phy_id("FHTT00000001")[0]["olt"], "10.0.0.2")
+        self.assertEqual(len(index.summary()), 2)
+
+    def test_carried_slots_report_their_own_age(self) -> None:
+        records = parse_onu_records(
+            AUTH_OUTPUT + "2    1   1   HG260    A  1   up  FHTT00000002\n"
+        )
+        save_onu_records("10.0.0.1", records, slot_collected_at={"1": time() - 3600})
+        index = OnuIndex()
+        index.refresh()
+
+        self.assertGreaterEqual(index.by_onu("10.0.0.1", "1", "1", "1")["age"], 3600)
+        self.assertLess(index.by_onu("10.0.0.1", "2", "1", "1")["age"], 60)
+        self.assertGreaterEqual(index.summary()[0]["age"], 3600)
+
+    def test_onu_signals_keep_unrefreshed_pons_and_drop_vanished_ones(self) -> None:
+        save_onu_signals("10.0.0.1", {"1/2": (time(), [("1", -25.0)])}, {"1/1", "1/2"})
+        save_onu_signals("10.0.0.1", {}, {"1/2"})
+
+        pons = load_state("10.0.0.1", ONU_SIGNALS_STATE)["pons"]
+        self.assertEqual(list(pons), ["1/2"])
+        self.assertEqual(pons["1/2"]["recv_power"], {"1": -25.0})
+
+    def test_phy_id_lookup_skips_olt_missing_from_the_view(self) -> None:
+        index = OnuIndex()
+        index.refresh()
+        olts, by_phy_id = index._view
+        index._view = ({}, by_phy_id)
+
+        self.assertEqual(index.by_phy_id("SHLN3c27de63"), [])
+        index._view = (olts, by_phy_id)
+        self.assertEqual(len(index.by_phy_id("SHLN3c27de63")), 1)
+
+    def test_directories_without_a_table_do_not_force_a_rebuild(self) -> None:
+        (Path(self.temp_dir.name) / "127.0.0.1_10051").mkdir()
+        index = OnuIndex()
+        index.refresh()
+        view = index._view
+
+        index.refresh()
+
+        self.assertIs(index._view, view)
+        self.assertEqual(len(index.summary()), 1)
+
+    def test_http_api_serves_lookups(self) -> None:
+        server = make_server(port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(f"{base}/olt/10.0.0.1/onu/1/1/2") as response:
+                body = json.loads(response.read())
+            with self.assertRaises(urllib.error.HTTPError) as missing:
+                urllib.request.urlopen(f"{base}/onu/UNKNOWN")
+            missing.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(body["phy_id"], "ZTEGd1ee503c")
+        self.assertEqual(missing.exception.code, 404)
@@ -0,0 +1,84 @@
+import unittest
+
+from fiberhome.parsers import (
+    parse_onu_detail,
+    parse_onu_records,
+    parse_onu_signals,
+    parse_pon_optics,
+    parse_pon_signals,
+)
+
+AUTH_OUTPUT = """
+----- ONU Auth Table, SLOT = 1, PON = 1, ITEM = 2 -----
+Slot Pon Onu OnuType  ST Lic OST PhyId
+1    1   1   HG260    A  1   up  SHLN3c27de63
+1    1   2   HG260    A  1   dn  ZTEGd1ee503c
+"""
+
+SIGNAL_OUTPUT = """
+----- PON OPTIC MODULE PAR INFO -----
+NAME          VALUE     UNIT
+---------------------------------------
+TYPE         : 20       (KM)
+TEMPERATURE  : 47.38    ('C)
+VOLTAGE      : 3.28     (V)
+BIAS CURRENT : 22.42    (mA)
+SEND POWER   : 4.52     (Dbm)
+---------------------------------------
+ONU_NO  RECV_POWER , ITEM=3
+1       -27.53  (Dbm)
+2       -21.33  (Dbm)
+3       -19.10  (Dbm)
+"""
+
+
+class ParserTests(unittest.TestCase):
+    def test_parse_pon_signals_summarizes_recv_power(self) -> None:
+        signals = parse_pon_signals(SIGNAL_OUTPUT, "1", "2")
+
+        self.assertIsNotNone(signals)
+        self.assertEqual(signals.best_signal, -19.10)
+        self.assertEqual(signals.poor_signal, -27.53)
+        self.assertEqual(signals.median_signal, -21.33)
+        self.assertEqual(signals.onu_count, 3)
+
+    def test_parse_pon_optics_extracts_header_fields(self) -> None:
+        optics = parse_pon_optics(SIGNAL_OUTPUT, "1", "2")
+
+        self.assertIsNotNone(optics)
+        self.assertEqual(optics.pon_name, "1/2")
+        self.assertEqual(optics.type_km, 20.0)
+        self.assertEqual(optics.temperature, 47.38)
+        self.assertEqual(optics.voltage, 3.28)
+        self.assertEqual(optics.bias_current, 22.42)
+        self.assertEqual(optics.tx_power, 4.52)
+
+    def test_parse_pon_optics_returns_none_without_header(self) -> None:
+        self.assertIsNone(parse_pon_optics("1       -27.53  (Dbm)\n", "1", "1"))
+
+    def test_parse_onu_records_keeps_identity(self) -> None:
+        records = parse_onu_records(AUTH_OUTPUT)
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[("1", "1", "2")].phy_id, "ZTEGd1ee503c")
+        self.assertEqual(records[("1", "1", "2")].status, "dn")
+        self.assertEqual(records[("1", "1", "1")].onu_type, "HG260")
+
+    def test_parse_onu_signals_keeps_onu_number(self) -> None:
+        self.assertEqual(
+            parse_onu_signals(SIGNAL_OUTPUT),
+            [("1", -27.53), ("2", -21.33), ("3", -19.10)],
+        )
+
+    def test_parse_onu_detail_accepts_colon_and_equals(self) -> None:
+        output = (
+            "-----  ONU LAST ON AND OFF TIME  -----\n"
+            "Last On Time  = 2024-05-01 10:05:00\n"
+            "Last Off Time = 2024-05-01 10:00:00\n"
+            "Last Down Cause : LOS\n"
+        )
+
+        self.assertEqual(
+            parse_onu_detail(output),
+            {"last_down_time": "2024-05-01 10:00:00", "last_down_cause": "LOS"},
+        )
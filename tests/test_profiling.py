@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fiberhome.profiling import (
+    PROFILE_DIR_ENV,
+    PROFILE_ENV,
+    PROFILE_FLAG,
+    capture_profile,
+    profiling_enabled,
+)
+
+
+class ProfilingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.env = patch.dict(os.environ, {PROFILE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+        os.environ.pop(PROFILE_ENV, None)
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def test_disabled_by_default_writes_nothing(self) -> None:
+        with capture_profile("status", "10.0.0.1"):
+            sum(range(100))
+
+        self.assertFalse(profiling_enabled("10.0.0.1"))
+        self.assertEqual(list(self.root.iterdir()), [])
+
+    def test_env_selects_olts(self) -> None:
+        with patch.dict(os.environ, {PROFILE_ENV: "10.0.0.1, 10.0.0.2"}):
+            self.assertTrue(profiling_enabled("10.0.0.2"))
+            self.assertFalse(profiling_enabled("10.0.0.3"))
+
+    def test_flag_file_enables_capture_and_rotates(self) -> None:
+        olt_dir = self.root / "10.0.0.1"
+        olt_dir.mkdir()
+        (olt_dir / PROFILE_FLAG).touch()
+
+        for _ in range(3):
+            with capture_profile("status", "10.0.0.1", keep=2):
+                [str(i) for i in range(1000)]
+
+        profiles = sorted(olt_dir.glob("status-*.prof"))
+        summaries = sorted(olt_dir.glob("status-*.txt"))
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual(len(summaries), 2)
+        summary = summaries[-1].read_text(encoding="utf-8")
+        self.assertIn("tracemalloc_peak_kib", summary)
+        self.assertIn("startup_cpu_ms", summary)
+
+    def test_unwritable_profile_dir_does_not_change_the_result(self) -> None:
+        blocker = self.root / "not-a-dir"
+        blocker.write_text("", encoding="utf-8")
+
+        with patch.dict(os.environ, {PROFILE_ENV: "1", PROFILE_DIR_ENV: str(blocker)}):
+            with capture_profile("status", "10.0.0.1"):
+                result = sum(range(100))
+            with self.assertRaises(ValueError):
+                with capture_profile("status", "10.0.0.1"):
+                    raise ValueError("collector failed")
+
+        self.assertEqual(result, 4950)
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, patch
 from fiberhome.scrapli_client import (
     PROMPT_PATTERN,
     FiberhomeClient,
+    parse_port_spec,
 )
 
 
@@ -37,6 +38,33 @@ class FiberhomeClientTests(unittest.IsolatedAsyncioTestCase):
         driver.open.assert_awaited_once()
         driver.send_interactive.assert_awaited()
 
+    @patch("fiberhome.scrapli_client.AsyncGenericDriver")
+    async def test_port_spec_selects_compressed_ssh(self, driver_cls: AsyncMock) -> None:
+        driver = AsyncMock()
+        driver.get_prompt = AsyncMock(return_value="Admin#")
+        driver_cls.return_value = driver
+        client = FiberhomeClient("10.0.0.1", "user", "pass", port="ssh+zlib:2222")
+
+        await client.connect()
+
+        kwargs = driver_cls.call_args.kwargs
+        self.assertEqual(kwargs["port"], 2222)
+        self.assertEqual(kwargs["transport"], "asyncssh")
+        self.assertEqual(kwargs["comms_prompt_pattern"], PROMPT_PATTERN)
+        self.assertEqual(
+            kwargs["transport_options"]["asyncssh"]["compression_algs"][0],
+            "zlib@openssh.com",
+        )
+        driver.send_interactive.assert_not_awaited()
+
+    def test_parse_port_spec(self) -> None:
+        self.assertEqual(parse_port_spec("23"), ("telnet", 23, False))
+        self.assertEqual(parse_port_spec(2323), ("telnet", 2323, False))
+        self.assertEqual(parse_port_spec("ssh:22"), ("ssh", 22, False))
+        self.assertEqual(parse_port_spec("SSH+zlib:22"), ("ssh", 22, True))
+        with self.assertRaises(ValueError):
+            parse_port_spec("rlogin:513")
+
     @patch("fiberhome.scrapli_client.AsyncGenericDriver")
     async def test_send_command_returns_text_result(self, driver_cls: AsyncMock) -> None:
         driver = AsyncMock()
@@ -62,3 +90,19 @@ class FiberhomeClientTests(unittest.IsolatedAsyncioTestCase):
         await client.disconnect()
 
         driver.close.assert_awaited_once()
+
+    @patch("fiberhome.scrapli_client.AsyncGenericDriver")
+    async def test_failed_command_makes_session_not_reusable(self, driver_cls: AsyncMock) -> None:
+        driver = AsyncMock()
+        driver.get_prompt = AsyncMock(return_value="User>")
+        driver_cls.return_value = driver
+        client = FiberhomeClient("10.0.0.1", "user", "pass")
+
+        await client.connect()
+        self.assertTrue(await client.is_alive())
+        driver.send_command.side_effect = TimeoutError("no prompt")
+        with self.assertRaises(TimeoutError):
+            await client.send_command("show onu")
+
+        self.assertFalse(client.reusable)
+        self.assertFalse(await client.is_alive())
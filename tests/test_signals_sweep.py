@@ -0,0 +1,184 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fiberhome.constants import CMD_WAIT_SIGNAL, SIGNALS_EXIT_RESERVE
+from fiberhome.onu_index import ONU_SIGNALS_STATE
+from fiberhome.state import STATE_DIR_ENV, load_state
+from fiberhome_olt_signals import SWEEP_STATE, collect_olt_signals, sweep_order
+
+AUTH_OUTPUT = "\n".join(
+    f"{slot}    {pon}   1   HG260    A  1   up  SHLN3c27de6{pon}"
+    for slot, pon in [("1", "1"), ("1", "2"), ("2", "1")]
+)
+
+
+def signal_output(power: str) -> str:
+    return f"ONU_NO  RECV_POWER , ITEM=1\n1       {power}  (Dbm)\n"
+
+
+class FakeClient:
+    def __init__(self, failing: set[str] | None = None, delay: float = 0.0) -> None:
+        self.failing = failing or set()
+        self.delay = delay
+        self.polled: list[str] = []
+        self.sessions = 0
+
+    async def __aenter__(self) -> "FakeClient":
+        self.sessions += 1
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def collect_onu_authorization(self, timeout: float | None = None) -> str:
+        return AUTH_OUTPUT
+
+    async def collect_pon_signals(self, slot: str, pon: str, timeout: float = 15) -> str:
+        self.polled.append(f"{slot}/{pon}")
+        await asyncio.sleep(self.delay)
+        if f"{slot}/{pon}" in self.failing:
+            raise TimeoutError("command timed out")
+        return signal_output("-21.50")
+
+
+class SignalsSweepTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {STATE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def test_sweep_order_resumes_after_cursor(self) -> None:
+        pairs = {("1", "1"), ("1", "2"), ("2", "1")}
+
+        self.assertEqual(sweep_order(pairs, None), sorted(pairs))
+        self.assertEqual(sweep_order(pairs, ["1", "2"]), [("2", "1"), ("1", "1"), ("1", "2")])
+        self.assertEqual(sweep_order(pairs, ["9", "9"]), sorted(pairs))
+
+    async def test_failed_pon_does_not_fail_the_run(self) -> None:
+        client = FakeClient(failing={"1/2"})
+
+        result = await collect_olt_signals(
+            "10.0.0.1", "u", "p", client_factory=lambda *args, **kwargs: client
+        )
+
+        metadata = result["data"]["metadata"]
+        self.assertTrue(metadata["success"])
+        self.assertFalse(metadata["complete"])
+        self.assertEqual(metadata["pons_failed"], ["1/2"])
+        self.assertEqual(
+            [entry["pon_name"] for entry in result["data"]["pon_signals"]], ["1/1", "2/1"]
+        )
+
+    async def test_session_is_reopened_after_a_failed_pon(self) -> None:
+        client = FakeClient(failing={"1/1"})
+
+        await collect_olt_signals(
+            "10.0.0.1", "u", "p", client_factory=lambda *args, **kwargs: client
+        )
+
+        self.assertEqual(client.polled, ["1/1", "1/2", "2/1"])
+        self.assertEqual(client.sessions, 2)
+
+    async def test_reopen_login_is_capped_by_the_time_left(self) -> None:
+        client = FakeClient(failing={"1/1"})
+        timeouts = []
+
+        def factory(*args: object, **kwargs: object) -> FakeClient:
+            timeouts.append(kwargs.get("timeout"))
+            return client
+
+        await collect_olt_signals("10.0.0.1", "u", "p", client_factory=factory, deadline=15)
+
+        self.assertEqual(client.sessions, 2)
+        self.assertLessEqual(timeouts[1], 15 - SIGNALS_EXIT_RESERVE - CMD_WAIT_SIGNAL)
+
+    async def test_no_reopen_without_time_for_a_login(self) -> None:
+        client = FakeClient(failing={"1/1"})
+        with patch("fiberhome_olt_signals.CMD_WAIT_SIGNAL", 0.2):
+            result = await collect_olt_signals(
+                "10.0.0.1",
+                "u",
+                "p",
+                client_factory=lambda *args, **kwargs: client,
+                deadline=SIGNALS_EXIT_RESERVE + 2,
+            )
+
+        self.assertEqual(client.polled, ["1/1"])
+        self.assertEqual(client.sessions, 1)
+        self.assertTrue(result["data"]["metadata"]["success"])
+
+    async def test_pons_refreshed_in_slow_sweep_have_age_zero(self) -> None:
+        client = FakeClient(delay=0.6)
+
+        result = await collect_olt_signals(
+            "10.0.0.1", "u", "p", client_factory=lambda *args, **kwargs: client
+        )
+
+        entries = result["data"]["pon_signals"]
+        self.assertEqual(len(entries), 3)
+        self.assertEqual([entry["age"] for entry in entries], [0, 0, 0])
+        self.assertTrue(all(entry["refreshed"] for entry in entries))
+
+    async def test_state_write_failure_still_returns_data(self) -> None:
+        client = FakeClient()
+
+        with patch("fiberhome_olt_signals.save_state", side_effect=OSError("disk full")):
+            result = await collect_olt_signals(
+                "10.0.0.1", "u", "p", client_factory=lambda *args, **kwargs: client
+            )
+
+        self.assertTrue(result["data"]["metadata"]["success"])
+        self.assertEqual(len(result["data"]["pon_signals"]), 3)
+
+    async def test_deadline_limits_sweep_and_next_run_resumes(self) -> None:
+        first = FakeClient(delay=0.2)
+        with patch("fiberhome_olt_signals.CMD_WAIT_SIGNAL", 0.2):
+            result = await collect_olt_signals(
+                "10.0.0.1",
+                "u",
+                "p",
+                client_factory=lambda *args, **kwargs: first,
+                deadline=SIGNALS_EXIT_RESERVE + 0.3,
+            )
+
+        self.assertEqual(first.polled, ["1/1"])
+        self.assertEqual(load_state("10.0.0.1", SWEEP_STATE)["cursor"], ["1", "1"])
+        self.assertEqual(result["data"]["metadata"]["pons_refreshed"], 1)
+
+        second = FakeClient()
+        result = await collect_olt_signals(
+            "10.0.0.1", "u", "p", client_factory=lambda *args, **kwargs: second
+        )
+
+        self.assertEqual(second.polled, ["1/2", "2/1", "1/1"])
+        self.assertTrue(result["data"]["metadata"]["complete"])
+        self.assertTrue(all(entry["age"] == 0 for entry in result["data"]["pon_signals"]))
+        self.assertTrue(all(entry["refreshed"] for entry in result["data"]["pon_signals"]))
+
+    async def test_worst_onus_join_identity(self) -> None:
+        client = FakeClient()
+
+        with patch("fiberhome_olt_signals.WORST_ONU_COUNT", 2):
+            result = await collect_olt_signals(
+                "10.0.0.1", "u", "p", client_factory=lambda *args, **kwargs: client
+            )
+
+        worst = result["data"]["worst_onus"]
+        self.assertEqual(len(worst["global"]), 2)
+        self.assertEqual(sorted(worst["per_pon"]), ["1/1", "1/2", "2/1"])
+        first = worst["per_pon"]["1/2"][0]
+        self.assertEqual(first["phy_id"], "SHLN3c27de62")
+        self.assertEqual(first["status"], "up")
+        self.assertEqual(first["recv_power"], -21.5)
+        # The sweep cache stays bounded; per-ONU readings live with the ONU index.
+        sweep = load_state("10.0.0.1", SWEEP_STATE)["pons"]
+        self.assertTrue(all("recv_power" not in entry for entry in sweep.values()))
+        onu_signals = load_state("10.0.0.1", ONU_SIGNALS_STATE)["pons"]
+        self.assertEqual(onu_signals["1/2"]["recv_power"]["1"], -21.5)
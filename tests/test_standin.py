@@ -0,0 +1,54 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from bench.standin import (
+    WireProxy,
+    auth_responder,
+    server_port,
+    start_ssh_standin,
+    start_telnet_standin,
+    synthetic_auth_output,
+)
+from fiberhome.state import STATE_DIR_ENV
+from fiberhome_olt_status import collect_olt_status
+
+
+@unittest.skipUnless(importlib.util.find_spec("asyncssh"), "asyncssh not installed")
+class StandInTransportTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {STATE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+        responder = auth_responder(synthetic_auth_output(slots=2, pons=16, onus=64))
+        self.telnet = await start_telnet_standin(responder, "secret")
+        self.ssh = await start_ssh_standin(responder, "user", "secret")
+
+    async def asyncTearDown(self) -> None:
+        self.telnet.close()
+        self.ssh.close()
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    async def _collect(self, scheme: str, target: object) -> tuple[dict, int]:
+        proxy = WireProxy(server_port(target))
+        port = await proxy.start()
+        spec = f"{scheme}:{port}" if scheme else str(port)
+        result = await collect_olt_status("127.0.0.1", "user", "secret", spec)
+        await proxy.stop()
+        return result, proxy.bytes_down
+
+    async def test_ssh_matches_telnet_output_and_compresses(self) -> None:
+        telnet, telnet_bytes = await self._collect("", self.telnet)
+        ssh, ssh_bytes = await self._collect("ssh", self.ssh)
+        zlib, zlib_bytes = await self._collect("ssh+zlib", self.ssh)
+
+        for result in (telnet, ssh, zlib):
+            self.assertTrue(result["data"]["metadata"]["success"])
+        self.assertEqual(telnet["data"]["totals"]["provisioned"], 2048)
+        self.assertEqual(ssh["data"]["pon_ports"], telnet["data"]["pon_ports"])
+        self.assertEqual(zlib["data"]["pon_ports"], telnet["data"]["pon_ports"])
+        self.assertLess(zlib_bytes, ssh_bytes / 3)
+        self.assertLess(zlib_bytes, telnet_bytes / 3)
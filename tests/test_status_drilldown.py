@@ -0,0 +1,167 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fiberhome.dialects import DEFAULT_DIALECT, RP1000_DETAIL_DIALECT
+from fiberhome.state import STATE_DIR_ENV
+from fiberhome_olt_status import collect_olt_status, drilldown_targets
+
+
+DETAIL_OUTPUT = "Last Down Cause : LOS\nLast Down Time  : 2024-05-01 10:00:00\nDistance(m) : 1532\n"
+
+
+def auth_output(second_status: str, extra: int = 0, extra_status: str = "up") -> str:
+    return (
+        "1    1   1   HG260    A  1   up  SHLN3c27de63\n"
+        f"1    1   2   HG260    A  1   {second_status}  ZTEGd1ee503c\n"
+    ) + "".join(
+        f"1    2   {onu}   HG260    A  1   {extra_status}  FHTT{onu:08d}\n"
+        for onu in range(1, extra + 1)
+    )
+
+
+class FakeClient:
+    def __init__(
+        self,
+        second_status: str,
+        extra: int = 0,
+        extra_status: str = "up",
+        detail_fails: bool = False,
+    ) -> None:
+        self.second_status = second_status
+        self.extra = extra
+        self.extra_status = extra_status
+        self.detail_fails = detail_fails
+        self.detailed: list[tuple[str, str, str]] = []
+
+    async def __aenter__(self) -> "FakeClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def collect_onu_authorization(self, timeout: float | None = None) -> str:
+        return auth_output(self.second_status, self.extra, self.extra_status)
+
+    async def collect_onu_details(
+        self, positions: list, timeout: float = 15, deadline_at: float | None = None
+    ) -> dict:
+        if self.detail_fails:
+            raise TimeoutError("cd onu timed out")
+        self.detailed.extend(positions)
+        return {position: DETAIL_OUTPUT for position in positions}
+
+
+class StatusDrilldownTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {STATE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    async def _run(
+        self, second_status: str, deadline: float = 25, **kwargs: object
+    ) -> tuple[dict, FakeClient]:
+        client = FakeClient(second_status, **kwargs)
+        result = await collect_olt_status(
+            "10.0.0.1",
+            "u",
+            "p",
+            client_factory=lambda *args, **kwargs: client,
+            deadline=deadline,
+            dialect=RP1000_DETAIL_DIALECT,
+        )
+        return result, client
+
+    async def test_only_changed_onus_are_drilled_down(self) -> None:
+        first, first_client = await self._run("up")
+        down, down_client = await self._run("dn")
+        back, _ = await self._run("up")
+
+        self.assertEqual(first["data"]["changed_onus"], [])
+        self.assertEqual(first_client.detailed, [])
+
+        [change] = down["data"]["changed_onus"]
+        self.assertEqual((change["onu"], change["previous_status"]), ("2", "up"))
+        self.assertFalse(change["flapping"])
+        self.assertEqual(change["details"]["last_down_cause"], "LOS")
+        self.assertEqual(change["details"]["distance"], "1532")
+        self.assertEqual(down_client.detailed, [("1", "1", "2")])
+        self.assertEqual(down["data"]["metadata"]["drilldown_commands"], 1)
+
+        [recovered] = back["data"]["changed_onus"]
+        self.assertEqual(recovered["status"], "up")
+        self.assertTrue(recovered["flapping"])
+
+    async def test_onus_over_budget_are_deferred_to_the_next_run(self) -> None:
+        await self._run("up", extra=3)
+        with patch("fiberhome_olt_status.DRILLDOWN_BUDGET", 2):
+            down, down_client = await self._run("dn", extra=3, extra_status="dn")
+            later, later_client = await self._run("dn", extra=3, extra_status="dn")
+
+        self.assertEqual(len(down["data"]["changed_onus"]), 4)
+        self.assertEqual(len(down_client.detailed), 2)
+        self.assertEqual(down["data"]["metadata"]["drilldown_commands"], 2)
+
+        # The two ONUs left over are queried first and reported as deferred.
+        self.assertEqual(len(later_client.detailed), 2)
+        self.assertTrue(set(later_client.detailed).isdisjoint(down_client.detailed))
+        deferred = later["data"]["changed_onus"]
+        self.assertEqual(len(deferred), 2)
+        self.assertTrue(all(change["deferred"] and change["details"] for change in deferred))
+
+    async def test_failed_drilldown_counts_no_commands_and_defers(self) -> None:
+        await self._run("up")
+        failed, _ = await self._run("dn", detail_fails=True)
+        retried, client = await self._run("dn")
+
+        self.assertEqual(failed["data"]["metadata"]["drilldown_commands"], 0)
+        self.assertIsNone(failed["data"]["changed_onus"][0]["details"])
+        self.assertEqual(client.detailed, [("1", "1", "2")])
+        self.assertEqual(retried["data"]["metadata"]["drilldown_commands"], 1)
+
+    async def test_drilldown_is_deferred_without_enough_time_left(self) -> None:
+        await self._run("up")
+        late, late_client = await self._run("dn", deadline=1)
+        retried, client = await self._run("dn")
+
+        self.assertEqual(late_client.detailed, [])
+        self.assertEqual(late["data"]["metadata"]["drilldown_commands"], 0)
+        self.assertEqual(client.detailed, [("1", "1", "2")])
+        self.assertTrue(retried["data"]["changed_onus"][0]["deferred"])
+
+    async def test_dialect_without_detail_command_skips_drilldown(self) -> None:
+        await collect_olt_status(
+            "10.0.0.1",
+            "u",
+            "p",
+            client_factory=lambda *args, **kwargs: FakeClient("up"),
+            dialect=DEFAULT_DIALECT,
+        )
+        client = FakeClient("dn")
+        result = await collect_olt_status(
+            "10.0.0.1",
+            "u",
+            "p",
+            client_factory=lambda *args, **kwargs: client,
+            dialect=DEFAULT_DIALECT,
+        )
+
+        self.assertEqual(len(result["data"]["changed_onus"]), 1)
+        self.assertIsNone(result["data"]["changed_onus"][0]["details"])
+        self.assertEqual(client.detailed, [])
+
+    def test_targets_respect_budget_and_priority(self) -> None:
+        changes = [
+            {"onu": "1", "status": "up", "flapping": True},
+            {"onu": "2", "status": "up", "flapping": False},
+            {"onu": "3", "status": "dn", "flapping": False},
+            {"onu": "4", "status": "dn", "flapping": True},
+        ]
+
+        self.assertEqual([c["onu"] for c in drilldown_targets(changes, budget=2)], ["4", "3"])
+        self.assertEqual([c["onu"] for c in drilldown_targets(changes)], ["4", "3", "1"])
@@ -0,0 +1,200 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from time import time
+from unittest.mock import patch
+
+from fiberhome.onu_index import remember_slots, save_onu_records, slot_collected_at
+from fiberhome.parsers import parse_onu_records
+from fiberhome.state import STATE_DIR_ENV
+from fiberhome_olt_status import collect_olt_status, parse_auth_mode
+
+SLOT_ROWS = {
+    "1": (
+        "1    1   1   HG260    A  1   up  SHLN3c27de63\n"
+        "1    1   2   HG260    A  1   dn  ZTEGd1ee503c\n"
+    ),
+    "2": "2    3   1   HG260    A  1   up  FHTT00000001\n",
+}
+
+
+class FakeClient:
+    def __init__(self, olt: "FakeOlt") -> None:
+        self.olt = olt
+
+    async def __aenter__(self) -> "FakeClient":
+        if self.olt.login_fails:
+            raise ConnectionError("login refused")
+        self.olt.sessions += 1
+        self.olt.active += 1
+        self.olt.peak = max(self.olt.peak, self.olt.active)
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self.olt.active -= 1
+
+    async def collect_onu_authorization(self, timeout: float | None = None) -> str:
+        self.olt.queries.append("all")
+        return "".join(SLOT_ROWS.values())
+
+    async def collect_onu_authorization_slot(
+        self, slot: str, timeout: float = 20, deadline_at: float | None = None
+    ) -> str:
+        self.olt.queries.append(slot)
+        await asyncio.sleep(self.olt.slot_seconds)
+        if self.olt.failures.get(slot, 0):
+            self.olt.failures[slot] -= 1
+            raise TimeoutError(f"slot {slot} timed out")
+        return SLOT_ROWS.get(slot, "")
+
+
+class FakeOlt:
+    def __init__(
+        self,
+        failures: dict[str, int] | None = None,
+        login_fails: bool = False,
+        slot_seconds: float = 0,
+    ) -> None:
+        self.failures = dict(failures or {})
+        self.login_fails = login_fails
+        self.slot_seconds = slot_seconds
+        self.queries: list[str] = []
+        self.sessions = 0
+        self.active = 0
+        self.peak = 0
+        self.login_timeouts: list[object] = []
+
+    def factory(self, *args: object, **kwargs: object) -> FakeClient:
+        self.login_timeouts.append(kwargs.get("timeout"))
+        return FakeClient(self)
+
+
+class StatusSlotTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {STATE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+        remember_slots("10.0.0.1", {"1", "2"})
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    async def _run(self, olt: FakeOlt, auth_mode: str = "slots", **kwargs: float) -> dict:
+        return await collect_olt_status(
+            "10.0.0.1", "u", "p", client_factory=olt.factory, auth_mode=auth_mode, **kwargs
+        )
+
+    def _pons(self, result: dict) -> dict:
+        return {p["pon_name"]: p for p in result["data"]["pon_ports"]}
+
+    async def test_slots_are_queried_and_merged(self) -> None:
+        olt = FakeOlt()
+        result = await self._run(olt)
+
+        metadata = result["data"]["metadata"]
+        self.assertEqual(olt.queries, ["1", "2"])
+        self.assertEqual(metadata["auth_mode"], "slots")
+        self.assertTrue(metadata["complete"])
+        self.assertEqual(sorted(self._pons(result)), ["1/1", "2/3"])
+        self.assertEqual(result["data"]["totals"], {"provisioned": 3, "online": 2, "offline": 1})
+
+    async def test_failed_slot_is_retried_alone(self) -> None:
+        olt = FakeOlt(failures={"2": 1})
+        result = await self._run(olt)
+
+        self.assertEqual(olt.queries, ["1", "2", "2"])
+        self.assertEqual(olt.sessions, 2)
+        slot = result["data"]["metadata"]["slots"][1]
+        self.assertEqual((slot["slot"], slot["success"], slot["attempts"]), ("2", True, 2))
+        self.assertTrue(result["data"]["metadata"]["complete"])
+
+    async def test_slot_that_keeps_failing_returns_partial_result(self) -> None:
+        await self._run(FakeOlt())
+        olt = FakeOlt(failures={"1": 5})
+        result = await self._run(olt)
+
+        metadata = result["data"]["metadata"]
+        self.assertTrue(metadata["success"])
+        self.assertFalse(metadata["complete"])
+        self.assertEqual(metadata["stale_slots"], ["1"])
+        self.assertIn("timed out", metadata["slots"][0]["error"])
+        # The failed slot keeps its previous counts instead of dropping to zero.
+        self.assertEqual(self._pons(result)["1/1"]["provisioned"], 2)
+        self.assertEqual(result["data"]["changed_onus"], [])
+
+    async def test_kept_rows_keep_their_collection_time(self) -> None:
+        collected_at = time() - 3600
+        save_onu_records(
+            "10.0.0.1", parse_onu_records("".join(SLOT_ROWS.values())), collected_at=collected_at
+        )
+        result = await self._run(FakeOlt(failures={"1": 5}))
+
+        times = slot_collected_at("10.0.0.1")
+        self.assertEqual(times["1"], collected_at)
+        self.assertGreater(times["2"], collected_at)
+        self.assertGreaterEqual(self._pons(result)["1/1"]["age"], 3600)
+        self.assertEqual(self._pons(result)["2/3"]["age"], 0)
+
+    async def test_login_after_a_failed_slot_is_capped_by_the_deadline(self) -> None:
+        olt = FakeOlt(failures={"2": 1})
+        await self._run(olt, deadline=3)
+
+        self.assertEqual(len(olt.login_timeouts), 2)
+        self.assertTrue(all(0 < timeout <= 3 for timeout in olt.login_timeouts))
+
+    async def test_sessions_overlap_slots(self) -> None:
+        olt = FakeOlt()
+        await self._run(olt, auth_mode="slots:2")
+
+        self.assertEqual(olt.peak, 2)
+        self.assertEqual(sorted(olt.queries), ["1", "2"])
+
+    async def test_login_failure_fails_the_poll(self) -> None:
+        result = await self._run(FakeOlt(login_fails=True))
+
+        metadata = result["data"]["metadata"]
+        self.assertFalse(metadata["success"])
+        self.assertIn("login refused", metadata["error"])
+        # The failed poll still reports the requested mode and every slot.
+        self.assertEqual(metadata["auth_mode"], "slots")
+        self.assertEqual(metadata["stale_slots"], ["1", "2"])
+        self.assertIn("login refused", metadata["slots"][1]["error"])
+
+    async def test_every_slot_failing_fails_the_poll(self) -> None:
+        result = await self._run(FakeOlt(failures={"1": 5, "2": 5}))
+
+        metadata = result["data"]["metadata"]
+        self.assertFalse(metadata["success"])
+        self.assertIn("every slot", metadata["error"])
+        self.assertEqual(metadata["auth_mode"], "slots")
+        self.assertEqual([slot["attempts"] for slot in metadata["slots"]], [2, 2])
+
+    async def test_slots_left_at_the_deadline_are_stale(self) -> None:
+        await self._run(FakeOlt())
+        olt = FakeOlt(slot_seconds=0.2)
+        result = await self._run(olt, deadline=0.3)
+
+        metadata = result["data"]["metadata"]
+        self.assertEqual(olt.queries, ["1"])
+        self.assertTrue(metadata["success"])
+        self.assertEqual(metadata["stale_slots"], ["2"])
+        self.assertEqual(metadata["slots"][1]["attempts"], 0)
+        self.assertIn("deadline", metadata["slots"][1]["error"])
+        # The slot that was not queried keeps its previous rows.
+        self.assertEqual(self._pons(result)["2/3"]["provisioned"], 1)
+
+    async def test_without_slot_list_falls_back_to_monolithic_query(self) -> None:
+        olt = FakeOlt()
+        result = await collect_olt_status(
+            "10.0.0.2", "u", "p", client_factory=olt.factory, auth_mode="slots"
+        )
+
+        self.assertEqual(olt.queries, ["all"])
+        self.assertEqual(result["data"]["metadata"]["auth_mode"], "all")
+
+    def test_parse_auth_mode(self) -> None:
+        self.assertEqual(parse_auth_mode("slots:3"), ("slots", 3))
+        self.assertEqual(parse_auth_mode("slots"), ("slots", 1))
+        self.assertEqual(parse_auth_mode("bogus"), ("all", 1))
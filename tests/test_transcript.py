@@ -0,0 +1,176 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
+from unittest.mock import patch
+
+from fiberhome.dialects import DEFAULT_DIALECT
+from fiberhome.scrapli_client import FiberhomeClient
+from fiberhome.state import STATE_DIR_ENV
+from fiberhome.transcript import (
+    REDACTED,
+    TranscriptEvent,
+    read_transcript,
+    recording_wrapper,
+    redact_events,
+    replay_wrapper,
+)
+from fiberhome_olt_status import collect_olt_status
+
+# Recorded against bench/standin.py, not a real OLT.
+SAMPLE_TRANSCRIPT = Path(__file__).parent / "transcripts" / "standin_status.jsonl.gz"
+
+AUTH_OUTPUT = (
+    "----- ONU Auth Table, SLOT = 1, PON = 1, ITEM = 2 -----\n"
+    "Slot Pon Onu OnuType  ST Lic OST PhyId\n"
+    "1    1   1   HG260    A  1   up  SHLN3c27de63\n"
+    "1    1   2   HG260    A  1   dn  ZTEGd1ee503c\n"
+)
+
+
+class FakeOltTransport:
+    """Minimal Telnet-like OLT that echoes input and answers known commands."""
+
+    def __init__(self, inner: object) -> None:
+        self._base_transport_args = inner._base_transport_args
+        self._output: asyncio.Queue[bytes] = asyncio.Queue()
+        self._line = b""
+        self._state = "login"
+        self._prompt = b"User>"
+
+    async def open(self) -> None:
+        self._output.put_nowait(b"Login:")
+
+    def close(self) -> None:
+        pass
+
+    def isalive(self) -> bool:
+        return True
+
+    async def read(self) -> bytes:
+        return await self._output.get()
+
+    def write(self, channel_input: bytes) -> None:
+        if channel_input != b"\n":
+            self._line += channel_input
+            if self._state not in ("password", "enable"):
+                self._output.put_nowait(channel_input)
+            return
+
+        line, self._line = self._line.decode(), b""
+        if self._state == "login":
+            self._state = "password"
+            self._output.put_nowait(b"\r\nPassword:")
+        elif self._state in ("password", "enable"):
+            if self._state == "enable":
+                self._prompt = b"Admin#"
+            self._state = "cli"
+            self._output.put_nowait(b"\r\n" + self._prompt)
+        elif line == "EN":
+            self._state = "enable"
+            self._output.put_nowait(b"\r\nPassword:")
+        else:
+            body = AUTH_OUTPUT if line.startswith("show authorization") else ""
+            self._output.put_nowait(b"\r\n" + body.encode() + self._prompt)
+
+
+class TranscriptReplayTests(unittest.IsolatedAsyncioTestCase):
+    async def test_recorded_session_replays_through_status_pipeline(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, patch.dict(
+            os.environ, {STATE_DIR_ENV: temp_dir}
+        ):
+            path = Path(temp_dir) / "olt.jsonl.gz"
+            recorder = recording_wrapper(path, secrets=["secret"], header={"host": "olt"})
+
+            def record(inner: object) -> object:
+                return recorder(FakeOltTransport(inner))
+
+            live = await collect_olt_status(
+                "127.0.0.1",
+                "user",
+                "secret",
+                client_factory=partial(FiberhomeClient, transport_wrapper=record),
+            )
+            replayed = await collect_olt_status(
+                "127.0.0.1",
+                "user",
+                "ignored",
+                client_factory=partial(
+                    FiberhomeClient, transport_wrapper=replay_wrapper(path)
+                ),
+            )
+
+            header, events = read_transcript(path)
+
+        self.assertEqual(header["host"], "olt")
+        self.assertTrue(any(REDACTED in event.data for event in events))
+        self.assertFalse(any(b"secret" in event.data for event in events))
+        self.assertTrue(live["data"]["metadata"]["success"])
+        self.assertTrue(replayed["data"]["metadata"]["success"])
+        self.assertEqual(live["data"]["pon_ports"], replayed["data"]["pon_ports"])
+        self.assertEqual(replayed["data"]["totals"]["offline"], 1)
+
+    async def test_sample_transcript_replays(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, patch.dict(
+            os.environ, {STATE_DIR_ENV: temp_dir}
+        ):
+            result = await collect_olt_status(
+                "standin",
+                "replay",
+                "replay",
+                client_factory=partial(
+                    FiberhomeClient, transport_wrapper=replay_wrapper(SAMPLE_TRANSCRIPT)
+                ),
+            )
+
+        self.assertTrue(result["data"]["metadata"]["success"])
+        self.assertEqual(len(result["data"]["pon_ports"]), 32)
+        self.assertEqual(
+            result["data"]["totals"], {"provisioned": 1024, "online": 928, "offline": 96}
+        )
+
+
+    async def test_replay_rejects_a_different_command(self) -> None:
+        commands = {**DEFAULT_DIALECT.commands, "auth_all": "show authorization slot 1 pon all"}
+        with tempfile.TemporaryDirectory() as temp_dir, patch.dict(
+            os.environ, {STATE_DIR_ENV: temp_dir}
+        ):
+            result = await collect_olt_status(
+                "standin",
+                "replay",
+                "replay",
+                client_factory=partial(
+                    FiberhomeClient, transport_wrapper=replay_wrapper(SAMPLE_TRANSCRIPT)
+                ),
+                dialect=replace(DEFAULT_DIALECT, commands=commands),
+            )
+
+        self.assertFalse(result["data"]["metadata"]["success"])
+        self.assertIn("Unexpected write", result["data"]["metadata"]["error"])
+
+class TranscriptRedactionTests(unittest.TestCase):
+    def test_banner_identifiers_and_serials_are_masked(self) -> None:
+        events = [
+            TranscriptEvent(0.0, "r", b"\r\nOLT-CEN"),
+            TranscriptEvent(0.1, "r", b"TRO-01 restricted\r\nLogin:"),
+            TranscriptEvent(0.2, "w", b"admin"),
+            TranscriptEvent(0.3, "r", b"admin\r\nOLT-CENTRO-01#"),
+            TranscriptEvent(0.4, "r", b"\r\n1    1   1   HG260    A  1   up  SHLN3c2"),
+            TranscriptEvent(0.5, "r", b"7de63\r\n"),
+        ]
+
+        redacted = redact_events(events, secrets=["admin"], identifiers=["OLT-CENTRO-01"])
+        stream = b"".join(event.data for event in redacted if event.op == "r")
+
+        self.assertEqual(
+            [len(event.data) for event in redacted if event.op == "r"],
+            [len(event.data) for event in events if event.op == "r"],
+        )
+        self.assertEqual(redacted[2].data, REDACTED)
+        for leaked in (b"CENTRO", b"restricted", b"admin", b"3c27de63"):
+            self.assertNotIn(leaked, stream)
+        self.assertIn(b"Login:", stream)
+        self.assertRegex(stream, rb"up  SHLN[0-9a-f]{8}\r\n")
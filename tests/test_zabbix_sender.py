@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import socket
+import struct
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from fiberhome.state import STATE_DIR_ENV
+from fiberhome.zabbix_sender import (
+    ZBX_HEADER,
+    SenderValue,
+    ZabbixSender,
+    read_message,
+    response_values,
+)
+from fiberhome_olt_signals import collect_olt_signals
+
+SWEEP_AUTH_OUTPUT = "\n".join(
+    f"1    {pon}   1   HG260    A  1   up  SHLN3c27de6{pon}" for pon in range(1, 5)
+)
+
+
+class SlowSignalsClient:
+    """Fake OLT session where every PON takes a noticeable time."""
+
+    async def __aenter__(self) -> "SlowSignalsClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def collect_onu_authorization(self, timeout: float | None = None) -> str:
+        return SWEEP_AUTH_OUTPUT
+
+    async def collect_pon_signals(self, slot: str, pon: str, timeout: float = 15) -> str:
+        await asyncio.sleep(0.4)
+        return "ONU_NO  RECV_POWER , ITEM=1\n1       -21.50  (Dbm)\n"
+
+
+class StandInTrapper:
+    """Local stand-in for a Zabbix trapper that records every request."""
+
+    def __init__(self, port: int = 0) -> None:
+        self.requests: list[dict] = []
+        self._server = socket.create_server(("127.0.0.1", port))
+        self.port = self._server.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with conn:
+                request = read_message(conn)
+                self.requests.append(request)
+                count = len(request["data"])
+                payload = json.dumps(
+                    {
+                        "response": "success",
+                        "info": f"processed: {count}; failed: 0; total: {count}; "
+                        "seconds spent: 0.000100",
+                    }
+                ).encode()
+                conn.sendall(ZBX_HEADER + struct.pack("<Q", len(payload)) + payload)
+
+    def close(self) -> None:
+        self._server.close()
+
+
+class ZabbixSenderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {STATE_DIR_ENV: self.temp_dir.name})
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def test_send_batches_values(self) -> None:
+        trapper = StandInTrapper()
+        self.addCleanup(trapper.close)
+        values = [SenderValue("olt", f"OntOnline.[1/{i}]", str(i), 1700000000) for i in range(5)]
+
+        result = ZabbixSender("127.0.0.1", trapper.port, batch_size=2).send(values)
+
+        self.assertEqual(result.processed, 5)
+        self.assertEqual([len(r["data"]) for r in trapper.requests], [2, 2, 1])
+        self.assertEqual(trapper.requests[0]["request"], "sender data")
+        self.assertEqual(trapper.requests[0]["data"][0]["key"], "OntOnline.[1/0]")
+
+    def test_undelivered_values_are_buffered_and_retried(self) -> None:
+        trapper = StandInTrapper()
+        port = trapper.port
+        trapper.close()
+        values = [SenderValue("olt", "TotalOntOnline", "10", 1700000000)]
+
+        result = ZabbixSender("127.0.0.1", port, timeout=1).send(values)
+        self.assertEqual(result.buffered, 1)
+
+        trapper = StandInTrapper(port)
+        self.addCleanup(trapper.close)
+        retry = [SenderValue("olt", "TotalOntOffline", "2", 1700000060)]
+        result = ZabbixSender("127.0.0.1", port).send(retry)
+
+        self.assertEqual(result.processed, 2)
+        self.assertEqual(
+            [item["key"] for item in trapper.requests[0]["data"]],
+            ["TotalOntOnline", "TotalOntOffline"],
+        )
+
+    def test_values_buffered_by_another_process_during_a_push_are_kept(self) -> None:
+        sender = ZabbixSender("127.0.0.1", 10051)
+        other = ZabbixSender("127.0.0.1", 10051)
+        old = SenderValue("olt", "TotalOntOnline", "10", 1700000000)
+        concurrent = SenderValue("olt-2", "TotalOntOnline", "7", 1700000060)
+        sender._save_buffer([old])
+
+        def send_batch(values: list[SenderValue]) -> tuple[int, int]:
+            other._update_buffer([], [concurrent])
+            return len(values), 0
+
+        with patch.object(sender, "_send_batch", side_effect=send_batch):
+            result = sender.send([SenderValue("olt", "TotalOntOffline", "2", 1700000060)])
+
+        self.assertEqual(result.processed, 2)
+        self.assertEqual(other._load_buffer(), [concurrent])
+
+    def test_response_values_skips_cached_signals(self) -> None:
+        response = {
+            "data": {
+                "pon_signals": [
+                    {"pon_name": "1/1", "best_signal": -19.0, "median_signal": -21.0,
+                     "poor_signal": -25.0, "age": 0, "refreshed": True},
+                    {"pon_name": "1/2", "best_signal": -18.0, "median_signal": -20.0,
+                     "poor_signal": -24.0, "age": 3600, "refreshed": False},
+                ],
+                "pon_optics": [],
+                "metadata": {
+                    "timestamp": "2024-01-01T00:00:00+00:00",
+                    "collection_time_ms": 1200,
+                    "success": True,
+                },
+            }
+        }
+
+        keys = [value.key for value in response_values("olt", response)]
+
+        self.assertIn("OntPoorSinal.[1/1]", keys)
+        self.assertNotIn("OntPoorSinal.[1/2]", keys)
+        self.assertIn("fiberhome.signals.success", keys)
+
+
+class SweepPushTests(unittest.IsolatedAsyncioTestCase):
+    async def test_every_pon_refreshed_in_a_slow_sweep_is_pushed(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, patch.dict(
+            os.environ, {STATE_DIR_ENV: temp_dir}
+        ):
+            client = SlowSignalsClient()
+            response = await collect_olt_signals(
+                "10.0.0.1", "u", "p", client_factory=lambda *args, **kwargs: client
+            )
+
+        keys = [value.key for value in response_values("olt", response)]
+
+        for pon in range(1, 5):
+            self.assertIn(f"OntBestSinal.[1/{pon}]", keys)
+            self.assertIn(f"OntPoorSinal.[1/{pon}]", keys)